@@ -2,12 +2,107 @@
 S-DES算法核心实现
 """
 
-from typing import List, Tuple
+import time
+from functools import lru_cache
+from typing import Callable, Iterator, List, Optional, Tuple, Union
+
+
+class PreparedKey:
+    """预处理后的密钥：保存K1/K2及其派生代换表，创建后不可修改"""
+    
+    __slots__ = ('_sdes', '_generation', '_key', '_k1', '_k2', '_encrypt_table', '_decrypt_table')
+    
+    def __init__(self, sdes: 'SDES', key: int):
+        k1, k2 = sdes.generate_subkeys_int(key)
+        object.__setattr__(self, '_sdes', sdes)
+        # 创建时的查找表版本：参数重新赋值后该预处理密钥失效
+        object.__setattr__(self, '_generation', sdes._table_generation)
+        object.__setattr__(self, '_key', key)
+        object.__setattr__(self, '_k1', k1)
+        object.__setattr__(self, '_k2', k2)
+        object.__setattr__(self, '_encrypt_table', None)
+        object.__setattr__(self, '_decrypt_table', None)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("PreparedKey对象不可修改")
+    
+    def __repr__(self) -> str:
+        return f"PreparedKey(key={self._key:010b}, k1={self._k1:08b}, k2={self._k2:08b})"
+    
+    @property
+    def key(self) -> int:
+        """10位整数密钥"""
+        return self._key
+    
+    @property
+    def k1(self) -> int:
+        """8位整数子密钥K1"""
+        return self._k1
+    
+    @property
+    def k2(self) -> int:
+        """8位整数子密钥K2"""
+        return self._k2
+    
+    @property
+    def encrypt_table(self) -> bytes:
+        """该密钥下全部256个数据块的加密结果（首次访问时生成）"""
+        if self._encrypt_table is None:
+            feistel, k1, k2 = self._sdes._feistel_int, self._k1, self._k2
+            table = bytes(feistel(block, k1, k2) for block in range(256))
+            object.__setattr__(self, '_encrypt_table', table)
+        return self._encrypt_table
+    
+    @property
+    def decrypt_table(self) -> bytes:
+        """该密钥下全部256个数据块的解密结果（加密表的逆置换）"""
+        if self._decrypt_table is None:
+            table = bytearray(256)
+            for block, encrypted in enumerate(self.encrypt_table):
+                table[encrypted] = block
+            object.__setattr__(self, '_decrypt_table', bytes(table))
+        return self._decrypt_table
+
+
+# 密钥参数类型：10位二进制字符串、10位整数或预处理密钥
+KeyLike = Union[str, int, PreparedKey]
+
+
+class _Parameter:
+    """SDES参数（置换盒/S盒）：以元组保存防止原地修改，重新赋值时自动重建查找表"""
+    
+    def __set_name__(self, owner, name):
+        self.attribute = '_' + name
+    
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return getattr(instance, self.attribute)
+    
+    def __set__(self, instance, value):
+        value = tuple(tuple(row) if isinstance(row, (list, tuple)) else row for row in value)
+        setattr(instance, self.attribute, value)
+        # 构造函数中逐个赋值时查找表尚未生成，由构造函数统一生成
+        if 'f_table' in instance.__dict__:
+            instance.build_tables()
 
 
 class SDES:
     """S-DES算法核心实现类"""
     
+    # 预处理密钥缓存容量（全部密钥空间为1024）
+    KEY_CACHE_SIZE = 1024
+    
+    # 算法参数：整数引擎的查找表由这些参数派生，赋值新参数即可更换算法
+    IP = _Parameter()
+    IP_INV = _Parameter()
+    EP = _Parameter()
+    SP = _Parameter()
+    S1 = _Parameter()
+    S2 = _Parameter()
+    P8 = _Parameter()
+    P10 = _Parameter()
+    
     def __init__(self):
         # 初始置换盒 (IP)
         self.IP = [2, 6, 3, 1, 4, 8, 5, 7]
@@ -42,6 +137,110 @@ class SDES:
         
         # P10置换盒（用于密钥扩展）
         self.P10 = [3, 5, 2, 7, 4, 10, 1, 9, 8, 6]
+        
+        # 预计算整数查找表
+        self.build_tables()
+    
+    def build_tables(self):
+        """根据当前参数预计算整数引擎使用的查找表（参数重新赋值时自动调用）"""
+        # 置换表：下标为输入整数，值为置换后的整数
+        self.ip_table = self._permutation_table(self.IP, 8)
+        self.ip_inv_table = self._permutation_table(self.IP_INV, 8)
+        self.ep_table = self._permutation_table(self.EP, 4)
+        self.p10_table = self._permutation_table(self.P10, 10)
+        self.p8_table = self._permutation_table(self.P8, 10)
+        
+        # 左右两个5位半区分别循环左移1位、2位
+        self.shift1_table = [self._rotate_halves(k, 1) for k in range(1024)]
+        self.shift2_table = [self._rotate_halves(k, 2) for k in range(1024)]
+        
+        # 轮函数F表：下标为 EP(R) ^ K 的8位值，值为S盒替换并经SP置换后的4位结果
+        sp_table = self._permutation_table(self.SP, 4)
+        self.f_table = [
+            sp_table[(self._s_box_int(x >> 4, self.S1) << 2) | self._s_box_int(x & 0xF, self.S2)]
+            for x in range(256)
+        ]
+        
+        # 参数变化后旧的预处理密钥失效，重新创建缓存并递增版本号
+        self._table_generation = getattr(self, '_table_generation', 0) + 1
+        self._prepared_key_cache = lru_cache(maxsize=self.KEY_CACHE_SIZE)(self._create_prepared_key)
+        self._bitsliced = None
+    
+    @staticmethod
+    def _permutation_table(permutation: List[int], width: int) -> List[int]:
+        """生成width位整数的置换查找表（位序与字符串一致，第1位为最高位）"""
+        table = []
+        for value in range(1 << width):
+            result = 0
+            for position in permutation:
+                result = (result << 1) | ((value >> (width - position)) & 1)
+            table.append(result)
+        return table
+    
+    @staticmethod
+    def _rotate_halves(key: int, shift: int) -> int:
+        """10位整数的左右5位分别循环左移"""
+        left, right = key >> 5, key & 0x1F
+        left = ((left << shift) | (left >> (5 - shift))) & 0x1F
+        right = ((right << shift) | (right >> (5 - shift))) & 0x1F
+        return (left << 5) | right
+    
+    @staticmethod
+    def _s_box_int(nibble: int, s_box: List[List[int]]) -> int:
+        """4位整数的S盒替换（第1、4位为行，第2、3位为列）"""
+        row = ((nibble >> 2) & 0b10) | (nibble & 1)
+        col = (nibble >> 1) & 0b11
+        return s_box[row][col]
+    
+    def generate_subkeys_int(self, key: int) -> Tuple[int, int]:
+        """由10位整数密钥生成8位整数子密钥K1和K2"""
+        shifted_1 = self.shift1_table[self.p10_table[key]]
+        shifted_2 = self.shift2_table[shifted_1]
+        return self.p8_table[shifted_1], self.p8_table[shifted_2]
+    
+    def _feistel_int(self, block: int, first: int, second: int) -> int:
+        """对8位整数执行IP、两轮Feistel与IP^-1"""
+        ip_result = self.ip_table[block]
+        left, right = ip_result >> 4, ip_result & 0xF
+        
+        # 第一轮
+        f_table, ep_table = self.f_table, self.ep_table
+        left ^= f_table[ep_table[right] ^ first]
+        
+        # 交换后第二轮（第一轮结果作为右半部分）
+        right ^= f_table[ep_table[left] ^ second]
+        
+        return self.ip_inv_table[(right << 4) | left]
+    
+    def _create_prepared_key(self, key: int) -> PreparedKey:
+        """创建预处理密钥（由缓存调用）"""
+        return PreparedKey(self, key)
+    
+    def prepare_key(self, key: KeyLike) -> PreparedKey:
+        """预处理密钥：生成并缓存子密钥，供分组、文本和暴力破解重复使用"""
+        if isinstance(key, PreparedKey):
+            if key._sdes is self and key._generation == self._table_generation:
+                return key
+            key = key.key
+        elif isinstance(key, str):
+            key = int(key.zfill(10), 2)
+        if not 0 <= key < 1024:
+            raise ValueError("密钥必须是10位")
+        return self._prepared_key_cache(key)
+    
+    def key_cache_info(self):
+        """返回预处理密钥缓存的命中统计"""
+        return self._prepared_key_cache.cache_info()
+    
+    def encrypt_int(self, block: int, key: KeyLike) -> int:
+        """加密8位整数数据块（密钥为10位整数或预处理密钥）"""
+        prepared = self.prepare_key(key)
+        return self._feistel_int(block, prepared._k1, prepared._k2)
+    
+    def decrypt_int(self, block: int, key: KeyLike) -> int:
+        """解密8位整数数据块（密钥为10位整数或预处理密钥）"""
+        prepared = self.prepare_key(key)
+        return self._feistel_int(block, prepared._k2, prepared._k1)
     
     def permute(self, data: List[int], permutation: List[int]) -> List[int]:
         """执行置换操作"""
@@ -110,105 +309,150 @@ class SDES:
         # SP置换
         return self.permute(combined, self.SP)
     
-    def encrypt_block(self, plaintext: str, key: str) -> str:
+    def encrypt_block(self, plaintext: str, key: KeyLike) -> str:
         """加密单个8位数据块"""
-        # 将明文转换为8位二进制
-        plaintext_bits = [int(bit) for bit in plaintext.zfill(8)]
-        
-        # 生成子密钥
-        k1, k2 = self.generate_keys(key)
-        
-        # 初始置换
-        ip_result = self.permute(plaintext_bits, self.IP)
-        
-        # 分割为左右两部分
-        left = ip_result[:4]
-        right = ip_result[4:]
-        
-        # 第一轮：使用K1
-        f_result = self.f_function(right, k1)
-        new_right = [left[i] ^ f_result[i] for i in range(4)]
-        new_left = right
-        
-        # 第二轮：使用K2
-        f_result2 = self.f_function(new_right, k2)
-        final_left = [new_left[i] ^ f_result2[i] for i in range(4)]
-        final_right = new_right
-        
-        # 合并
-        combined = final_left + final_right
-        
-        # 最终置换
-        ciphertext = self.permute(combined, self.IP_INV)
-        
-        return ''.join(map(str, ciphertext))
+        ciphertext = self.encrypt_int(int(plaintext.zfill(8), 2), key)
+        return format(ciphertext, '08b')
     
-    def decrypt_block(self, ciphertext: str, key: str) -> str:
+    def decrypt_block(self, ciphertext: str, key: KeyLike) -> str:
         """解密单个8位数据块"""
-        # 将密文转换为8位二进制
-        ciphertext_bits = [int(bit) for bit in ciphertext.zfill(8)]
-        
-        # 生成子密钥
-        k1, k2 = self.generate_keys(key)
-        
-        # 初始置换
-        ip_result = self.permute(ciphertext_bits, self.IP)
-        
-        # 分割为左右两部分
-        left = ip_result[:4]
-        right = ip_result[4:]
-        
-        # 第一轮：使用K2（解密时密钥顺序相反）
-        f_result = self.f_function(right, k2)
-        new_right = [left[i] ^ f_result[i] for i in range(4)]
-        new_left = right
-        
-        # 第二轮：使用K1
-        f_result2 = self.f_function(new_right, k1)
-        final_left = [new_left[i] ^ f_result2[i] for i in range(4)]
-        final_right = new_right
-        
-        # 合并
-        combined = final_left + final_right
-        
-        # 最终置换
-        plaintext = self.permute(combined, self.IP_INV)
-        
-        return ''.join(map(str, plaintext))
+        plaintext = self.decrypt_int(int(ciphertext.zfill(8), 2), key)
+        return format(plaintext, '08b')
+    
+    def _split_double_key(self, key: Union[str, int]) -> Tuple[int, int]:
+        """将20位组合密钥拆分为两个10位密钥（高10位为第一重密钥）"""
+        if isinstance(key, str):
+            key = int(key.zfill(20), 2)
+        if not 0 <= key < (1 << 20):
+            raise ValueError("双重加密密钥必须是20位")
+        return key >> 10, key & 0x3FF
+    
+    def double_encrypt_int(self, block: int, key: Union[str, int]) -> int:
+        """双重加密 E_k2(E_k1(x))，key为20位组合密钥 k1||k2"""
+        k1, k2 = self._split_double_key(key)
+        return self.encrypt_int(self.encrypt_int(block, k1), k2)
+    
+    def double_decrypt_int(self, block: int, key: Union[str, int]) -> int:
+        """双重解密 D_k1(D_k2(y))，key为20位组合密钥 k1||k2"""
+        k1, k2 = self._split_double_key(key)
+        return self.decrypt_int(self.decrypt_int(block, k2), k1)
     
-    def encrypt_ascii(self, text: str, key: str) -> str:
+    def double_encrypt_block(self, plaintext: str, key: str) -> str:
+        """双重加密单个8位数据块（20位密钥）"""
+        return format(self.double_encrypt_int(int(plaintext.zfill(8), 2), key), '08b')
+    
+    def double_decrypt_block(self, ciphertext: str, key: str) -> str:
+        """双重解密单个8位数据块（20位密钥）"""
+        return format(self.double_decrypt_int(int(ciphertext.zfill(8), 2), key), '08b')
+    
+    def triple_encrypt_int(self, block: int, k1: KeyLike, k2: KeyLike, k3: Optional[KeyLike] = None) -> int:
+        """三重加密（EDE）E_k3(D_k2(E_k1(x)))，未给出k3时使用双密钥模式 k3 = k1"""
+        if k3 is None:
+            k3 = k1
+        return self.encrypt_int(self.decrypt_int(self.encrypt_int(block, k1), k2), k3)
+    
+    def triple_decrypt_int(self, block: int, k1: KeyLike, k2: KeyLike, k3: Optional[KeyLike] = None) -> int:
+        """三重解密（EDE）D_k1(E_k2(D_k3(y)))，未给出k3时使用双密钥模式 k3 = k1"""
+        if k3 is None:
+            k3 = k1
+        return self.decrypt_int(self.encrypt_int(self.decrypt_int(block, k3), k2), k1)
+    
+    def triple_encrypt_block(self, plaintext: str, k1: KeyLike, k2: KeyLike, k3: Optional[KeyLike] = None) -> str:
+        """三重加密单个8位数据块"""
+        return format(self.triple_encrypt_int(int(plaintext.zfill(8), 2), k1, k2, k3), '08b')
+    
+    def triple_decrypt_block(self, ciphertext: str, k1: KeyLike, k2: KeyLike, k3: Optional[KeyLike] = None) -> str:
+        """三重解密单个8位数据块"""
+        return format(self.triple_decrypt_int(int(ciphertext.zfill(8), 2), k1, k2, k3), '08b')
+    
+    def encrypt_bytes(self, data, key: KeyLike) -> bytes:
+        """加密字节序列（支持任意bytes-like对象，按密钥的256字节代换表批量转换）"""
+        return bytes(data).translate(self.prepare_key(key).encrypt_table)
+    
+    def decrypt_bytes(self, data, key: KeyLike) -> bytes:
+        """解密字节序列（支持任意bytes-like对象，按密钥的256字节代换表批量转换）"""
+        return bytes(data).translate(self.prepare_key(key).decrypt_table)
+    
+    # encrypt_into/decrypt_into 每次转换的切片大小
+    INTO_SLICE_SIZE = 1 << 20
+    
+    def _translate_into(self, src, dst, table: bytes) -> int:
+        """按切片查表转换src并写入可写缓冲区dst，src与dst可以是同一缓冲区"""
+        src_view = memoryview(src).cast('B')
+        dst_view = memoryview(dst).cast('B')
+        length = len(src_view)
+        if len(dst_view) < length:
+            raise ValueError("目标缓冲区长度不足")
+        step = self.INTO_SLICE_SIZE
+        for start in range(0, length, step):
+            end = min(start + step, length)
+            dst_view[start:end] = src_view[start:end].tobytes().translate(table)
+        return length
+    
+    def encrypt_into(self, src, dst, key: KeyLike) -> int:
+        """加密src并写入调用方提供的bytearray/memoryview，返回写入的字节数（临时内存仅为一个切片）"""
+        return self._translate_into(src, dst, self.prepare_key(key).encrypt_table)
+    
+    def decrypt_into(self, src, dst, key: KeyLike) -> int:
+        """解密src并写入调用方提供的bytearray/memoryview，返回写入的字节数（临时内存仅为一个切片）"""
+        return self._translate_into(src, dst, self.prepare_key(key).decrypt_table)
+    
+    def encrypt_ascii(self, text: str, key: KeyLike) -> str:
         """加密文本字符串（使用UTF-8编码处理）"""
-        result = ""
-        # 将文本编码为UTF-8字节序列
-        utf8_bytes = text.encode('utf-8')
-        
-        for byte_val in utf8_bytes:
-            # 将字节转换为8位二进制
-            binary = format(byte_val, '08b')
-            # 加密
-            encrypted = self.encrypt_block(binary, key)
-            # 转换回ASCII字符
-            encrypted_ascii_val = int(encrypted, 2)
-            result += chr(encrypted_ascii_val)
-        
-        return result
-    
-    def decrypt_ascii(self, text: str, key: str) -> str:
+        # 每个密文字节对应一个码位0-255的字符，与latin-1解码等价
+        return self.encrypt_bytes(text.encode('utf-8'), key).decode('latin-1')
+    
+    def decrypt_ascii(self, text: str, key: KeyLike) -> str:
         """解密文本字符串（使用UTF-8编码处理）"""
-        result_bytes = []
-        
-        for char in text:
-            # 将字符转换为ASCII码，再转换为8位二进制
-            ascii_val = ord(char)
-            binary = format(ascii_val, '08b')
-            # 解密
-            decrypted = self.decrypt_block(binary, key)
-            # 转换回字节值
-            byte_val = int(decrypted, 2)
-            result_bytes.append(byte_val)
-        
-        # 将字节序列解码为UTF-8字符串
-        return bytes(result_bytes).decode('utf-8')
+        # 每个密文字符的码位即为一个密文字节
+        return self.decrypt_bytes(text.encode('latin-1'), key).decode('utf-8')
+    
+    def search_keys(self, plaintext: Union[str, int], ciphertext: Union[str, int],
+                    first_only: bool = False,
+                    should_stop: Optional[Callable[[], bool]] = None,
+                    progress: Optional[Callable[[int, int], None]] = None,
+                    progress_interval: float = 0.1,
+                    chunk_size: int = 256) -> Iterator[str]:
+        """已知明密文对暴力搜索密钥，逐个产出匹配的10位密钥字符串
+        
+        first_only: 找到第一个密钥后立即停止
+        should_stop: 返回True时取消搜索（在每批密钥之间检查）
+        progress: 进度回调 progress(已检查密钥数, 总密钥数)，按时间间隔节流，结束时必定调用一次
+        """
+        if isinstance(plaintext, str):
+            plaintext = int(plaintext.zfill(8), 2)
+        if isinstance(ciphertext, str):
+            ciphertext = int(ciphertext.zfill(8), 2)
+        
+        # 位切片引擎一次检查一批密钥（延迟导入避免循环依赖）
+        if self._bitsliced is None:
+            from sdes_bitslice import BitslicedSDES
+            self._bitsliced = BitslicedSDES(self)
+        
+        total_keys = 1024
+        checked_keys = 0
+        last_report = time.perf_counter()
+        
+        for start in range(0, total_keys, chunk_size):
+            if should_stop is not None and should_stop():
+                break
+            
+            count = min(chunk_size, total_keys - start)
+            matches = self._bitsliced.search_keys(plaintext, ciphertext, start, count)
+            checked_keys += count
+            
+            if progress is not None:
+                now = time.perf_counter()
+                if now - last_report >= progress_interval or checked_keys == total_keys:
+                    progress(checked_keys, total_keys)
+                    last_report = now
+            
+            for key in matches:
+                yield format(key, '010b')
+                if first_only:
+                    if progress is not None and checked_keys < total_keys:
+                        progress(checked_keys, total_keys)
+                    return
     
     def validate_key(self, key: str) -> bool:
         """验证密钥格式"""
@@ -216,6 +460,12 @@ class SDES:
             return False
         return all(c in '01' for c in key)
     
+    def validate_double_key(self, key: str) -> bool:
+        """验证双重加密密钥格式（20位）"""
+        if not key or len(key) != 20:
+            return False
+        return all(c in '01' for c in key)
+    
     def validate_block(self, block: str) -> bool:
         """验证数据块格式"""
         if not block or len(block) != 8:
@@ -227,10 +477,11 @@ class SDES:
         if not self.validate_key(key):
             return {"valid": False}
         
-        k1, k2 = self.generate_keys(key)
+        # 与加解密使用同一套查找表生成子密钥
+        k1, k2 = self.generate_subkeys_int(int(key, 2))
         return {
             "valid": True,
             "key": key,
-            "k1": ''.join(map(str, k1)),
-            "k2": ''.join(map(str, k2))
+            "k1": format(k1, '08b'),
+            "k2": format(k2, '08b')
         }
@@ -0,0 +1,274 @@
+"""
+S-DES全密钥空间分析：等价密钥与码本碰撞统计、置换循环结构、统计质量（雪崩与分布）
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import sys
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+
+from sdes_codebook import CodebookEngine
+from sdes_tablecache import parameter_hash
+
+
+# 报告中记录的SDES算法参数（置换盒与S盒）
+PARAMETER_NAMES = ('IP', 'IP_INV', 'EP', 'SP', 'S1', 'S2', 'P8', 'P10')
+
+
+def codebook_rows(codebook: Optional[CodebookEngine] = None) -> List[bytes]:
+    """全部1024个密钥的256字节加密行（即每个密钥的完整码本）"""
+    codebook = CodebookEngine.full() if codebook is None else codebook.build_all()
+    table = bytes(codebook.encrypt_table)
+    return [table[key << 8:(key + 1) << 8] for key in range(CodebookEngine.KEY_COUNT)]
+
+
+def fingerprint(row: bytes) -> str:
+    """码本指纹（SHA-256前16个十六进制字符）"""
+    return hashlib.sha256(row).hexdigest()[:16]
+
+
+def _group_keys(signatures: Sequence) -> List[List[int]]:
+    """按签名把密钥分组，只返回包含多个密钥的组（按首个密钥排序）"""
+    groups: Dict[object, List[int]] = {}
+    for key, signature in enumerate(signatures):
+        groups.setdefault(signature, []).append(key)
+    return sorted(group for group in groups.values() if len(group) > 1)
+
+
+def equivalent_key_groups(codebook: Optional[CodebookEngine] = None) -> List[List[int]]:
+    """功能等价的密钥组（256个数据块的加密结果完全相同）"""
+    return _group_keys(codebook_rows(codebook))
+
+
+def keys_matching_under(plaintexts: Sequence[int], codebook: Optional[CodebookEngine] = None) -> List[List[int]]:
+    """在给定明文集合上加密结果相同的密钥组（这些明文无法区分组内密钥）"""
+    rows = codebook_rows(codebook)
+    return _group_keys([bytes(row[p] for p in plaintexts) for row in rows])
+
+
+def collision_report(codebook: Optional[CodebookEngine] = None,
+                     plaintexts: Optional[Sequence[int]] = None) -> dict:
+    """全密钥空间碰撞报告（内容只取决于SDES参数，可直接比较不同参数下的结果）"""
+    codebook = CodebookEngine.full() if codebook is None else codebook.build_all()
+    rows = codebook_rows(codebook)
+    key_count = CodebookEngine.KEY_COUNT
+    groups = _group_keys(rows)
+
+    class_sizes = Counter(len(group) for group in groups)
+    class_sizes[1] = key_count - sum(len(group) for group in groups)
+
+    # 每个明文下有多少对密钥得到相同密文
+    colliding_pairs = []
+    distinct_ciphertexts = []
+    for plaintext in range(CodebookEngine.BLOCK_COUNT):
+        counts = Counter(row[plaintext] for row in rows)
+        colliding_pairs.append(sum(n * (n - 1) // 2 for n in counts.values()))
+        distinct_ciphertexts.append(len(counts))
+
+    sdes = codebook.sdes
+    report = {
+        "parameters": {name: getattr(sdes, name) for name in PARAMETER_NAMES},
+        "parameter_hash": parameter_hash(sdes).hex(),
+        "codebook_digest": hashlib.sha256(b''.join(rows)).hexdigest(),
+        "keys": key_count,
+        "distinct_codebooks": len({fingerprint(row) for row in rows}),
+        "class_size_histogram": {str(size): count for size, count in sorted(class_sizes.items()) if count},
+        "equivalent_key_groups": [
+            {"keys": [format(key, '010b') for key in group], "fingerprint": fingerprint(rows[group[0]])}
+            for group in groups
+        ],
+        "per_plaintext": {
+            "colliding_key_pairs_mean": sum(colliding_pairs) / len(colliding_pairs),
+            "colliding_key_pairs_min": min(colliding_pairs),
+            "colliding_key_pairs_max": max(colliding_pairs),
+            # 密钥随机均匀映射到256个密文时的期望值
+            "colliding_key_pairs_expected": key_count * (key_count - 1) / 2 / 256,
+            "distinct_ciphertexts_min": min(distinct_ciphertexts),
+            "distinct_ciphertexts_max": max(distinct_ciphertexts)
+        }
+    }
+
+    if plaintexts is not None:
+        matching = _group_keys([bytes(row[p] for p in plaintexts) for row in rows])
+        report["plaintext_set"] = {
+            "plaintexts": [format(p, '08b') for p in plaintexts],
+            "indistinguishable_groups": [[format(key, '010b') for key in group] for group in matching],
+            "keys_uniquely_identified": key_count - sum(len(group) for group in matching)
+        }
+    return report
+
+
+# 不动点数量达到该值的密钥列为可疑弱密钥（随机置换的不动点数期望为1）
+WEAK_FIXED_POINTS = 4
+
+
+def cycle_decomposition(row: bytes) -> List[int]:
+    """置换的循环分解：返回每个元素所在循环的长度（下标为元素）"""
+    lengths = [0] * len(row)
+    for start in range(len(row)):
+        if lengths[start]:
+            continue
+        cycle = [start]
+        value = row[start]
+        while value != start:
+            cycle.append(value)
+            value = row[value]
+        for value in cycle:
+            lengths[value] = len(cycle)
+    return lengths
+
+
+def permutation_summary(row: bytes) -> dict:
+    """单个密钥置换的循环类型、不动点、是否对合（加密两次还原）与阶"""
+    lengths = cycle_decomposition(row)
+    # 长度为L的循环有L个元素
+    cycle_type = {length: count // length for length, count in sorted(Counter(lengths).items())}
+    order = 1
+    for length in cycle_type:
+        order = order * length // math.gcd(order, length)
+    return {
+        "cycle_type": cycle_type,
+        "fixed_points": [x for x in range(len(row)) if row[x] == x],
+        "involution": max(cycle_type) <= 2,
+        "order": order,
+        # OFB从每个IV出发的密钥流周期就是IV所在循环的长度
+        "mean_ofb_period": sum(lengths) / len(lengths)
+    }
+
+
+def cycle_report(codebook: Optional[CodebookEngine] = None, per_key: bool = False) -> dict:
+    """全部密钥置换的循环结构汇总，并筛选对合密钥与不动点过多的弱密钥"""
+    rows = codebook_rows(codebook)
+    summaries = [permutation_summary(row) for row in rows]
+
+    fixed_point_histogram = Counter(len(summary["fixed_points"]) for summary in summaries)
+    order_histogram = Counter(summary["order"] for summary in summaries)
+    # 全部密钥中位于各长度循环内的元素数（即 (密钥, IV) 组合下的OFB周期分布）
+    ofb_period_histogram = Counter()
+    for summary in summaries:
+        for length, count in summary["cycle_type"].items():
+            ofb_period_histogram[length] += length * count
+
+    report = {
+        "keys": len(rows),
+        "fixed_point_histogram": {str(n): count for n, count in sorted(fixed_point_histogram.items())},
+        "order_histogram": {str(order): count for order, count in sorted(order_histogram.items())},
+        "ofb_period_histogram": {str(length): count for length, count in sorted(ofb_period_histogram.items())},
+        "mean_ofb_period": sum(summary["mean_ofb_period"] for summary in summaries) / len(summaries),
+        "mean_cycles_per_key": sum(sum(s["cycle_type"].values()) for s in summaries) / len(summaries),
+        "involution_keys": [format(key, '010b') for key, s in enumerate(summaries) if s["involution"]],
+        "weak_keys": [
+            {"key": format(key, '010b'), "fixed_points": len(s["fixed_points"]), "max_cycle": max(s["cycle_type"])}
+            for key, s in enumerate(summaries)
+            if s["involution"] or len(s["fixed_points"]) >= WEAK_FIXED_POINTS
+        ]
+    }
+    if per_key:
+        report["per_key"] = {
+            format(key, '010b'): {
+                "cycle_type": {str(length): count for length, count in s["cycle_type"].items()},
+                "fixed_points": s["fixed_points"],
+                "involution": s["involution"],
+                "order": s["order"]
+            }
+            for key, s in enumerate(summaries)
+        }
+    return report
+
+
+def _parse_plaintexts(text: str) -> List[int]:
+    """解析逗号分隔的8位二进制明文列表"""
+    plaintexts = []
+    for field in text.replace(' ', '').split(','):
+        if len(field) != 8 or any(c not in '01' for c in field):
+            raise argparse.ArgumentTypeError(f"明文必须是8位二进制: {field}")
+        plaintexts.append(int(field, 2))
+    return plaintexts
+
+
+def _write_report(report: dict, output: Optional[str]):
+    """以排序后的JSON输出报告（便于比较）"""
+    text = json.dumps(report, indent=2, sort_keys=True, ensure_ascii=False)
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+def cmd_collisions(args) -> int:
+    start_time = time.perf_counter()
+    report = collision_report(plaintexts=args.plaintexts)
+    elapsed = time.perf_counter() - start_time
+
+    _write_report(report, args.output)
+    print(f"不同码本: {report['distinct_codebooks']}/{report['keys']}, "
+          f"等价密钥组: {len(report['equivalent_key_groups'])}, 用时 {elapsed:.3f}秒", file=sys.stderr)
+    return 0
+
+
+def cmd_cycles(args) -> int:
+    start_time = time.perf_counter()
+    report = cycle_report(per_key=args.per_key)
+    elapsed = time.perf_counter() - start_time
+
+    _write_report(report, args.output)
+    print(f"对合密钥: {len(report['involution_keys'])}, 可疑弱密钥: {len(report['weak_keys'])}, "
+          f"平均OFB周期: {report['mean_ofb_period']:.1f}, 用时 {elapsed:.3f}秒", file=sys.stderr)
+    return 0
+
+
+def cmd_quality(args) -> int:
+    from sdes_quality import quality_report, render_charts
+    report = quality_report()
+    charts = render_charts(report, args.charts) if args.charts else []
+    elapsed = report.pop("time")
+
+    _write_report(report, args.output)
+    for path in charts:
+        print(f"图表: {path}", file=sys.stderr)
+    evaluations = sum(report["evaluations"].values())
+    print(f"明文雪崩: {report['plaintext_avalanche']['mean_flipped_bits']:.3f}位, "
+          f"密钥雪崩: {report['key_avalanche']['mean_flipped_bits']:.3f}位, "
+          f"卡方均值: {report['output_chi_square']['mean']:.1f} (自由度{report['output_chi_square']['dof']}), "
+          f"{evaluations}次翻转统计用时 {elapsed:.3f}秒", file=sys.stderr)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """构建命令行参数解析器"""
+    parser = argparse.ArgumentParser(prog="sdes_analysis", description="S-DES全密钥空间分析")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.required = True
+
+    collisions = subparsers.add_parser("collisions", help="等价密钥与碰撞统计（JSON报告）")
+    collisions.add_argument("--plaintexts", type=_parse_plaintexts, default=None,
+                            help="逗号分隔的明文，列出在这些明文上无法区分的密钥")
+    collisions.add_argument("--output", default=None, help="报告输出文件（默认标准输出）")
+    collisions.set_defaults(handler=cmd_collisions)
+
+    cycles = subparsers.add_parser("cycles", help="各密钥置换的循环结构、不动点与弱密钥筛选（JSON报告）")
+    cycles.add_argument("--per-key", action="store_true", help="报告中包含每个密钥的详细结果")
+    cycles.add_argument("--output", default=None, help="报告输出文件（默认标准输出）")
+    cycles.set_defaults(handler=cmd_cycles)
+
+    quality = subparsers.add_parser("quality", help="雪崩效应、比特偏差与输出分布卡方检验（JSON报告与PNG图表）")
+    quality.add_argument("--charts", default=None, help="PNG图表输出目录（不指定则不绘图）")
+    quality.add_argument("--output", default=None, help="报告输出文件（默认标准输出）")
+    quality.set_defaults(handler=cmd_quality)
+
+    return parser
+
+
+def main(argv=None):
+    """命令行入口"""
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,331 @@
+"""
+S-DES攻击工具：双重S-DES中间相遇攻击、文本密文的仅密文攻击、已知片段拖动搜索
+"""
+
+import io
+import math
+import time
+from collections import Counter
+from functools import lru_cache
+from typing import BinaryIO, Iterator, List, Optional, Sequence, Tuple, Union
+
+from sdes_codebook import CodebookEngine
+from sdes_keyindex import KnownPlaintextIndex
+
+
+def _filter_double_keys(codebook: CodebookEngine, candidates, pairs: Sequence[Tuple[int, int]]) -> List[int]:
+    """用其余明密文对过滤候选组合密钥"""
+    encrypt_table = codebook.encrypt_table
+    result = []
+    for k1, k2 in candidates:
+        if all(encrypt_table[(k2 << 8) | encrypt_table[(k1 << 8) | p]] == c for p, c in pairs):
+            result.append((k1 << 10) | k2)
+    return sorted(result)
+
+
+def meet_in_the_middle(pairs: Sequence[Tuple[int, int]], codebook: Optional[CodebookEngine] = None) -> dict:
+    """双重S-DES中间相遇攻击：前向加密与后向解密在中间值处用哈希表连接
+
+    pairs为已知的(明文, 密文)整数对，第一对用于连接，其余用于过滤误报。
+    """
+    if not pairs:
+        raise ValueError("至少需要一组明密文对")
+    start_time = time.perf_counter()
+    codebook = CodebookEngine.full() if codebook is None else codebook.build_all()
+    encrypt_table, decrypt_table = codebook.encrypt_table, codebook.decrypt_table
+    key_count = CodebookEngine.KEY_COUNT
+    plaintext, ciphertext = pairs[0]
+
+    # 前向：中间值 -> 第一重密钥列表
+    forward = {}
+    for k1 in range(key_count):
+        forward.setdefault(encrypt_table[(k1 << 8) | plaintext], []).append(k1)
+
+    # 后向：对每个第二重密钥解密密文，在哈希表中查找相同中间值
+    matches = []
+    for k2 in range(key_count):
+        for k1 in forward.get(decrypt_table[(k2 << 8) | ciphertext], ()):
+            matches.append((k1, k2))
+
+    keys = _filter_double_keys(codebook, matches, pairs[1:])
+    return {
+        "keys": [format(key, '020b') for key in keys],
+        "join_candidates": len(matches),
+        "evaluations": 2 * key_count + len(matches) * 2 * (len(pairs) - 1),
+        "time": time.perf_counter() - start_time
+    }
+
+
+def exhaustive_double_search(pairs: Sequence[Tuple[int, int]], codebook: Optional[CodebookEngine] = None) -> dict:
+    """双重S-DES穷举搜索：遍历全部2^20个组合密钥（用于与中间相遇攻击对比）"""
+    if not pairs:
+        raise ValueError("至少需要一组明密文对")
+    start_time = time.perf_counter()
+    codebook = CodebookEngine.full() if codebook is None else codebook.build_all()
+    encrypt_table = codebook.encrypt_table
+    key_count = CodebookEngine.KEY_COUNT
+    plaintext, ciphertext = pairs[0]
+
+    matches = []
+    for k1 in range(key_count):
+        middle = encrypt_table[(k1 << 8) | plaintext]
+        for k2 in range(key_count):
+            if encrypt_table[(k2 << 8) | middle] == ciphertext:
+                matches.append((k1, k2))
+
+    keys = _filter_double_keys(codebook, matches, pairs[1:])
+    return {
+        "keys": [format(key, '020b') for key in keys],
+        "join_candidates": len(matches),
+        "evaluations": key_count + key_count * key_count + len(matches) * 2 * (len(pairs) - 1),
+        "time": time.perf_counter() - start_time
+    }
+
+
+def benchmark_double_attack(key: str = "10100000100111001101", pair_count: int = 4) -> dict:
+    """对比中间相遇攻击与穷举搜索的耗时和运算量"""
+    codebook = CodebookEngine.full()
+    sdes = codebook.sdes
+    plaintexts = [0b10111101, 0b00000011, 0b01001101, 0b11001000, 0b00001001, 0b11110000][:pair_count]
+    pairs = [(p, sdes.double_encrypt_int(p, key)) for p in plaintexts]
+
+    mitm = meet_in_the_middle(pairs, codebook)
+    exhaustive = exhaustive_double_search(pairs, codebook)
+    if mitm["keys"] != exhaustive["keys"]:
+        raise AssertionError("中间相遇攻击与穷举搜索结果不一致")
+
+    return {
+        "key_found": key in mitm["keys"],
+        "candidate_keys": len(mitm["keys"]),
+        "mitm": mitm,
+        "exhaustive": exhaustive,
+        "speedup": exhaustive["time"] / mitm["time"]
+    }
+
+
+# 英文小写字母频率（%）
+ENGLISH_LETTER_FREQUENCIES = {
+    'e': 12.7, 't': 9.1, 'a': 8.2, 'o': 7.5, 'i': 7.0, 'n': 6.7, 's': 6.3, 'h': 6.1, 'r': 6.0,
+    'd': 4.3, 'l': 4.0, 'c': 2.8, 'u': 2.8, 'm': 2.4, 'w': 2.4, 'f': 2.2, 'g': 2.0, 'y': 2.0,
+    'p': 1.9, 'b': 1.5, 'v': 1.0, 'k': 0.8, 'j': 0.15, 'x': 0.15, 'q': 0.1, 'z': 0.07
+}
+
+# 每个字节"应跟随的UTF-8后续字节数 - 自身是否为后续字节"，对合法UTF-8文本求和应为0
+UTF8_BALANCE = tuple(
+    1 if 0xC2 <= b <= 0xDF else 2 if 0xE0 <= b <= 0xEF else 3 if 0xF0 <= b <= 0xF4
+    else -1 if 0x80 <= b <= 0xBF else 0
+    for b in range(256)
+)
+
+# 后续字节数量每相差一个的扣分（与一个几乎不可能出现的字节相当）
+UTF8_MISMATCH_PENALTY = 12.0
+
+
+def _log_weights(weights: Sequence[float]) -> Tuple[float, ...]:
+    total = sum(weights)
+    return tuple(math.log(weight / total) for weight in weights)
+
+
+@lru_cache(maxsize=None)
+def default_text_model() -> Tuple[float, ...]:
+    """默认明文字节模型（256个对数概率）：英文字母频率、空白与标点、UTF-8编码的中文"""
+    weights = [1e-4] * 256
+    for letter, frequency in ENGLISH_LETTER_FREQUENCIES.items():
+        weights[ord(letter)] = frequency * 0.6
+        weights[ord(letter.upper())] = frequency * 0.03
+    for b in range(0x21, 0x7F):
+        if not chr(b).isalnum():
+            weights[b] = 0.2
+    for b in b'0123456789':
+        weights[b] = 0.3
+    for b, weight in ((0x20, 15.0), (0x2E, 1.0), (0x2C, 1.0), (0x0A, 1.5), (0x0D, 0.3), (0x09, 0.2)):
+        weights[b] = weight
+    for b in range(0x80, 0xC0):
+        weights[b] = 0.3
+    for b in range(0xC2, 0xE0):
+        weights[b] = 0.05
+    for b in range(0xE0, 0xF0):
+        weights[b] = 0.6 if 0xE4 <= b <= 0xE9 else 0.3
+    for b in range(0xF0, 0xF5):
+        weights[b] = 0.01
+    return _log_weights(weights)
+
+
+def text_model_from_sample(sample: bytes) -> Tuple[float, ...]:
+    """由样本明文统计字节模型（加一平滑）"""
+    return _log_weights([count + 1 for count in byte_histogram(sample)])
+
+
+def byte_histogram(data: Union[bytes, bytearray, memoryview, str, BinaryIO],
+                   chunk_size: int = 1 << 20) -> List[int]:
+    """256个桶的字节频数直方图（str按encrypt_ascii的输出视为latin-1字节）
+
+    只遍历数据一次（安装了NumPy时用bincount，否则用Counter）；二进制文件对象按块流式读取。
+    """
+    if isinstance(data, str):
+        data = data.encode('latin-1')
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        data = io.BytesIO(data)
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+
+    histogram = [0] * 256
+    while True:
+        chunk = data.read(chunk_size)
+        if not chunk:
+            return histogram
+        if np is not None:
+            counts = np.bincount(np.frombuffer(chunk, dtype=np.uint8), minlength=256).tolist()
+        else:
+            counter = Counter(chunk)
+            counts = [counter[value] for value in range(256)]
+        histogram = [total + count for total, count in zip(histogram, counts)]
+
+
+def score_keys_by_histogram(histogram: Sequence[int], codebook: Optional[CodebookEngine] = None,
+                            model: Optional[Sequence[float]] = None) -> List[float]:
+    """为全部1024个密钥打分：经各密钥解密表置换直方图后，按明文模型计算对数似然并检查UTF-8结构
+
+    代价为 1024 × (不同密文字节数)，与密文长度无关。
+    """
+    codebook = CodebookEngine.full() if codebook is None else codebook.build_all()
+    decrypt_table = codebook.decrypt_table
+    model = model or default_text_model()
+    balance = UTF8_BALANCE
+    nonzero = [(ciphertext, count) for ciphertext, count in enumerate(histogram) if count]
+
+    scores = []
+    for key in range(CodebookEngine.KEY_COUNT):
+        base = key << 8
+        likelihood = 0.0
+        mismatch = 0
+        for ciphertext, count in nonzero:
+            plaintext = decrypt_table[base | ciphertext]
+            likelihood += count * model[plaintext]
+            mismatch += count * balance[plaintext]
+        scores.append(likelihood - UTF8_MISMATCH_PENALTY * abs(mismatch))
+    return scores
+
+
+def ciphertext_only_attack(ciphertext: Union[bytes, bytearray, str, BinaryIO],
+                           codebook: Optional[CodebookEngine] = None,
+                           model: Optional[Sequence[float]] = None, top: int = 10) -> dict:
+    """仅密文攻击：对ECB字节/encrypt_ascii密文按得分排序全部密钥，返回前top个候选
+
+    ciphertext也可以是二进制文件对象（按块流式统计字节频数，不整体读入内存）。
+    """
+    start_time = time.perf_counter()
+    histogram = byte_histogram(ciphertext)
+    total = sum(histogram)
+    if not total:
+        raise ValueError("密文不能为空")
+
+    scores = score_keys_by_histogram(histogram, codebook, model)
+    ranking = sorted(range(CodebookEngine.KEY_COUNT), key=lambda key: (-scores[key], key))[:top]
+    return {
+        "keys": [format(key, '010b') for key in ranking],
+        # 平均每字节得分，便于不同长度的密文比较
+        "scores": [scores[key] / total for key in ranking],
+        "bytes": total,
+        "distinct_bytes": sum(1 for count in histogram if count),
+        "time": time.perf_counter() - start_time
+    }
+
+
+def _crib_prefilter(index: KnownPlaintextIndex, crib: bytes, first: List[int]):
+    """构造NumPy偏移筛选函数：偏移处的密文首字节及每对相邻字节都必须能由某个密钥产生
+
+    这是精确位集求交的必要条件，可一次排除绝大多数偏移；未安装NumPy时返回None。
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+
+    # 每个片段字节在各密钥下的密文
+    columns = {}
+    for plaintext in set(crib):
+        column = np.empty(CodebookEngine.KEY_COUNT, dtype=np.uint16)
+        for ciphertext in range(256):
+            column[index.candidates(plaintext, ciphertext)] = ciphertext
+        columns[plaintext] = column
+
+    first_mask = np.array([bool(candidates) for candidates in first])
+    pair_masks = []
+    for left, right in zip(crib, crib[1:]):
+        mask = np.zeros(256 * 256, dtype=bool)
+        mask[(columns[left] << 8) | columns[right]] = True
+        pair_masks.append(mask)
+
+    def survivors(buffer: bytes, count: int) -> List[int]:
+        data = np.frombuffer(buffer, dtype=np.uint8)
+        alive = first_mask[data[:count]]
+        for position, mask in enumerate(pair_masks):
+            if not alive.any():
+                break
+            pairs = (data[position:position + count].astype(np.uint16) << 8) | data[position + 1:position + 1 + count]
+            alive &= mask[pairs]
+        return np.flatnonzero(alive).tolist()
+
+    return survivors
+
+
+def crib_search(ciphertext: Union[bytes, bytearray, memoryview, BinaryIO], crib: Union[bytes, str],
+                index: Optional[KnownPlaintextIndex] = None,
+                chunk_size: int = 1 << 20) -> Iterator[Tuple[int, str]]:
+    """已知片段拖动搜索：在ECB字节密文的每个偏移处假设明文为crib，逐字节与候选密钥位集求交
+
+    候选集合一旦为空立即放弃该偏移。ciphertext可以是字节串或二进制文件对象（按块流式读取，
+    相邻块保留 len(crib)-1 字节重叠），依次产生 (偏移, 密钥) 命中。
+    安装了NumPy时先按相邻字节对整体筛选偏移，只对剩余偏移做位集求交。
+    """
+    crib = crib.encode('utf-8') if isinstance(crib, str) else bytes(crib)
+    if not crib:
+        raise ValueError("已知片段不能为空")
+    index = index or KnownPlaintextIndex()
+
+    # 片段每个位置：密文字节 -> 候选密钥位集（相同明文字节共用一行）
+    rows = {plaintext: index.row_bitsets(plaintext) for plaintext in set(crib)}
+    first, rest = rows[crib[0]], [rows[plaintext] for plaintext in crib[1:]]
+    width = len(crib)
+    prefilter = _crib_prefilter(index, crib, first)
+
+    if isinstance(ciphertext, (bytes, bytearray, memoryview)):
+        ciphertext = io.BytesIO(ciphertext)
+
+    buffer = b''
+    base = 0
+    while True:
+        chunk = ciphertext.read(chunk_size)
+        if not chunk:
+            return
+        buffer += chunk
+
+        count = len(buffer) - width + 1
+        offsets = prefilter(buffer, count) if prefilter and count > 0 else range(count)
+        for offset in offsets:
+            candidates = first[buffer[offset]]
+            for position, table in enumerate(rest, offset + 1):
+                if not candidates:
+                    break
+                candidates &= table[buffer[position]]
+            while candidates:
+                lowest = candidates & -candidates
+                yield base + offset, format(lowest.bit_length() - 1, '010b')
+                candidates ^= lowest
+
+        # 保留末尾不足一个片段长度的字节，与下一块拼接
+        keep = min(width - 1, len(buffer))
+        base += len(buffer) - keep
+        buffer = buffer[len(buffer) - keep:]
+
+
+if __name__ == "__main__":
+    result = benchmark_double_attack()
+    print(f"真实密钥在候选中: {result['key_found']}，剩余候选组合密钥: {result['candidate_keys']}")
+    for name in ("mitm", "exhaustive"):
+        stats = result[name]
+        print(f"{name:10}: {stats['time']:.4f}秒, 运算量 {stats['evaluations']}, 首对匹配 {stats['join_candidates']}")
+    print(f"加速比: {result['speedup']:.1f}x")
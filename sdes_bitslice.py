@@ -0,0 +1,225 @@
+"""
+S-DES位切片（bitslice）引擎
+"""
+
+import time
+from functools import lru_cache
+from typing import List, Optional, Sequence, Union
+
+from sdes_algorithm import SDES
+
+
+class BitslicedSDES:
+    """S-DES位切片引擎：每一位保存为一个Python整数位平面，一次布尔运算同时处理所有通道"""
+
+    def __init__(self, sdes: Optional[SDES] = None):
+        self.sdes = sdes or SDES()
+        self.build_circuit()
+
+    def build_circuit(self):
+        """根据SDES参数生成密钥扩展连线与S盒布尔表达式"""
+        sdes = self.sdes
+
+        # 密钥扩展只是位的重新排列：对位序号执行P10、移位和P8得到子密钥各位的来源
+        key_positions = list(range(10))
+        key_p10 = sdes.permute(key_positions, sdes.P10)
+        shifted_1 = sdes.left_shift(key_p10[:5], 1) + sdes.left_shift(key_p10[5:], 1)
+        shifted_2 = sdes.left_shift(shifted_1[:5], 2) + sdes.left_shift(shifted_1[5:], 2)
+        self.k1_wiring = sdes.permute(shifted_1, sdes.P8)
+        self.k2_wiring = sdes.permute(shifted_2, sdes.P8)
+
+        # S盒每个输出位的代数正规型（ANF）
+        self.s1_anf = self._s_box_anf(sdes.S1)
+        self.s2_anf = self._s_box_anf(sdes.S2)
+
+    def _s_box_anf(self, s_box: List[List[int]]) -> List[List[int]]:
+        """计算S盒两个输出位的ANF，返回每个输出位包含的单项式列表"""
+        values = [self.sdes._s_box_int(x, s_box) for x in range(16)]
+        result = []
+        for shift in (1, 0):
+            coefficients = [(value >> shift) & 1 for value in values]
+            # Möbius变换：真值表 -> ANF系数
+            for bit in range(4):
+                step = 1 << bit
+                for x in range(16):
+                    if x & step:
+                        coefficients[x] ^= coefficients[x ^ step]
+            result.append([monomial for monomial in range(16) if coefficients[monomial]])
+        return result
+
+    @staticmethod
+    def _s_box(planes: List[int], anf: List[List[int]], mask: int) -> List[int]:
+        """位切片S盒：planes为4个输入位平面（第1位为最高位）"""
+        # 单项式乘积：products[m] 为 m 中各位对应输入平面的与
+        products = [mask] * 16
+        for monomial in range(1, 16):
+            low_bit = monomial & -monomial
+            products[monomial] = products[monomial ^ low_bit] & planes[4 - low_bit.bit_length()]
+        outputs = []
+        for monomials in anf:
+            value = 0
+            for monomial in monomials:
+                value ^= products[monomial]
+            outputs.append(value)
+        return outputs
+
+    def _f_function(self, right: List[int], subkey: List[int], mask: int) -> List[int]:
+        """位切片轮函数F"""
+        sdes = self.sdes
+        expanded = sdes.permute(right, sdes.EP)
+        xor_result = [e ^ k for e, k in zip(expanded, subkey)]
+        combined = self._s_box(xor_result[:4], self.s1_anf, mask) + self._s_box(xor_result[4:], self.s2_anf, mask)
+        return sdes.permute(combined, sdes.SP)
+
+    def _feistel(self, block: List[int], first: List[int], second: List[int], mask: int) -> List[int]:
+        """位切片的IP、两轮Feistel与IP^-1"""
+        sdes = self.sdes
+        ip_result = sdes.permute(block, sdes.IP)
+        left, right = ip_result[:4], ip_result[4:]
+
+        # 第一轮
+        f_result = self._f_function(right, first, mask)
+        new_right = [l ^ f for l, f in zip(left, f_result)]
+        new_left = right
+
+        # 第二轮
+        f_result2 = self._f_function(new_right, second, mask)
+        final_left = [l ^ f for l, f in zip(new_left, f_result2)]
+
+        return sdes.permute(final_left + new_right, sdes.IP_INV)
+
+    def subkey_planes(self, key_planes: List[int]):
+        """由10个密钥位平面得到K1、K2位平面（仅重新连线）"""
+        k1 = [key_planes[i] for i in self.k1_wiring]
+        k2 = [key_planes[i] for i in self.k2_wiring]
+        return k1, k2
+
+    def encrypt_planes(self, block_planes: List[int], key_planes: List[int], mask: int) -> List[int]:
+        """加密位平面"""
+        k1, k2 = self.subkey_planes(key_planes)
+        return self._feistel(block_planes, k1, k2, mask)
+
+    def decrypt_planes(self, block_planes: List[int], key_planes: List[int], mask: int) -> List[int]:
+        """解密位平面"""
+        k1, k2 = self.subkey_planes(key_planes)
+        return self._feistel(block_planes, k2, k1, mask)
+
+    @staticmethod
+    def pack(values: Sequence[int], width: int) -> List[int]:
+        """将整数序列打包为width个位平面（通道j对应平面的第j位）"""
+        planes = []
+        for shift in range(width - 1, -1, -1):
+            bits = ''.join('1' if (value >> shift) & 1 else '0' for value in reversed(values))
+            planes.append(int(bits, 2) if bits else 0)
+        return planes
+
+    @staticmethod
+    def unpack(planes: List[int], count: int) -> List[int]:
+        """将位平面还原为count个整数"""
+        columns = [format(plane, f'0{count}b')[::-1] for plane in planes]
+        return [int(''.join(bits), 2) for bits in zip(*columns)]
+
+    @staticmethod
+    def constant_planes(value: int, width: int, mask: int) -> List[int]:
+        """所有通道取同一值时的位平面"""
+        return [mask if (value >> shift) & 1 else 0 for shift in range(width - 1, -1, -1)]
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def key_range_planes(start: int, count: int) -> List[int]:
+        """密钥 start ~ start+count-1 依次占据各通道时的10个位平面"""
+        return BitslicedSDES.pack(range(start, start + count), 10)
+
+    def _run_many(self, blocks, keys, decrypt: bool) -> List[int]:
+        """对等长（或单值广播）的数据块与密钥批量运算"""
+        if isinstance(blocks, int):
+            blocks = [blocks] * len(keys)
+        if isinstance(keys, int):
+            keys = [keys] * len(blocks)
+        if len(blocks) != len(keys):
+            raise ValueError("数据块与密钥数量不一致")
+        count = len(blocks)
+        if count == 0:
+            return []
+
+        mask = (1 << count) - 1
+        block_planes = self.pack(blocks, 8)
+        key_planes = self.pack(keys, 10)
+        if decrypt:
+            result = self.decrypt_planes(block_planes, key_planes, mask)
+        else:
+            result = self.encrypt_planes(block_planes, key_planes, mask)
+        return self.unpack(result, count)
+
+    def encrypt_many(self, blocks: Union[int, Sequence[int]], keys: Union[int, Sequence[int]]) -> List[int]:
+        """批量加密（数据块或密钥可以是单个整数）"""
+        return self._run_many(blocks, keys, decrypt=False)
+
+    def decrypt_many(self, blocks: Union[int, Sequence[int]], keys: Union[int, Sequence[int]]) -> List[int]:
+        """批量解密（数据块或密钥可以是单个整数）"""
+        return self._run_many(blocks, keys, decrypt=True)
+
+    def search_keys(self, plaintext: int, ciphertext: int, start: int = 0, count: int = 1024) -> List[int]:
+        """已知明密文对，在密钥区间内一次性检查所有密钥，返回匹配的整数密钥"""
+        mask = (1 << count) - 1
+        block_planes = self.constant_planes(plaintext, 8, mask)
+        result = self.encrypt_planes(block_planes, self.key_range_planes(start, count), mask)
+
+        # 各位都与目标密文相同的通道即为匹配密钥
+        match = mask
+        for plane, target in zip(result, self.constant_planes(ciphertext, 8, mask)):
+            match &= ~(plane ^ target)
+        match &= mask
+
+        keys = []
+        while match:
+            low_bit = match & -match
+            keys.append(start + low_bit.bit_length() - 1)
+            match ^= low_bit
+        return keys
+
+
+def benchmark_brute_force(plaintext: str = "10111101", key: str = "1010000010", repeat: int = 20) -> dict:
+    """对比暴力破解场景下标量路径与位切片路径的吞吐量"""
+    sdes = SDES()
+    bitsliced = BitslicedSDES(sdes)
+    ciphertext = sdes.encrypt_block(plaintext, key)
+    plaintext_int, ciphertext_int = int(plaintext, 2), int(ciphertext, 2)
+
+    def measure(search):
+        start_time = time.perf_counter()
+        for _ in range(repeat):
+            found = search()
+        elapsed = (time.perf_counter() - start_time) / repeat
+        return found, elapsed
+
+    # 字符串接口逐个密钥尝试（第4关测试中的做法）
+    scalar_keys, scalar_time = measure(lambda: [
+        k for k in range(1024) if sdes.encrypt_block(plaintext, format(k, '010b')) == ciphertext
+    ])
+    # 整数引擎逐个密钥尝试
+    int_keys, int_time = measure(lambda: [
+        k for k in range(1024) if sdes.encrypt_int(plaintext_int, k) == ciphertext_int
+    ])
+    # 位切片一次处理全部1024个密钥
+    sliced_keys, sliced_time = measure(lambda: bitsliced.search_keys(plaintext_int, ciphertext_int))
+
+    if not scalar_keys == int_keys == sliced_keys:
+        raise AssertionError("位切片引擎结果与标量引擎不一致")
+
+    return {
+        "keys": [format(k, '010b') for k in sliced_keys],
+        "scalar_keys_per_sec": 1024 / scalar_time,
+        "int_keys_per_sec": 1024 / int_time,
+        "bitsliced_keys_per_sec": 1024 / sliced_time,
+        "speedup": scalar_time / sliced_time
+    }
+
+
+if __name__ == "__main__":
+    result = benchmark_brute_force()
+    print(f"匹配密钥: {result['keys']}")
+    print(f"字符串标量路径: {result['scalar_keys_per_sec']:.0f} 密钥/秒")
+    print(f"整数标量路径:   {result['int_keys_per_sec']:.0f} 密钥/秒")
+    print(f"位切片路径:     {result['bitsliced_keys_per_sec']:.0f} 密钥/秒")
+    print(f"加速比: {result['speedup']:.1f}x")
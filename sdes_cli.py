@@ -0,0 +1,265 @@
+"""
+S-DES命令行工具（无图形界面，不导入tkinter）
+
+子命令只在执行时才导入所需的算法模块，保证冷启动尽可能快。
+"""
+
+import argparse
+import sys
+import time
+
+
+def _check_key(parser: argparse.ArgumentParser, key: str):
+    if len(key) != 10 or any(c not in '01' for c in key):
+        parser.error("密钥必须是10位二进制")
+
+
+def _check_block(parser: argparse.ArgumentParser, block: str, name: str):
+    if len(block) != 8 or any(c not in '01' for c in block):
+        parser.error(f"{name}必须是8位二进制")
+
+
+def cmd_block(args, parser):
+    """加密/解密单个8位数据块"""
+    _check_key(parser, args.key)
+    _check_block(parser, args.block, "数据块")
+    from sdes_algorithm import SDES
+    sdes = SDES()
+    if args.action == "encrypt":
+        print(sdes.encrypt_block(args.block, args.key))
+    else:
+        print(sdes.decrypt_block(args.block, args.key))
+    return 0
+
+
+def cmd_text(args, parser):
+    """加密/解密UTF-8文本"""
+    _check_key(parser, args.key)
+    from sdes_algorithm import SDES
+    sdes = SDES()
+    # 默认十六进制：按字符输出的密文含控制字符（如\r、\x00），终端上无法原样复制
+    if args.action == "encrypt":
+        if args.raw:
+            print(sdes.encrypt_ascii(args.text, args.key))
+        else:
+            print(sdes.encrypt_bytes(args.text.encode('utf-8'), args.key).hex())
+    else:
+        # UnicodeError是ValueError的子类，需先于十六进制格式错误捕获
+        try:
+            if args.raw:
+                print(sdes.decrypt_ascii(args.text, args.key))
+            else:
+                print(sdes.decrypt_bytes(bytes.fromhex(args.text), args.key).decode('utf-8'))
+        except UnicodeEncodeError:
+            parser.error("密文包含码位大于255的字符，不是本工具 --raw 输出的文本密文")
+        except UnicodeDecodeError:
+            parser.error("解密结果不是有效的UTF-8文本（密钥错误或密文不完整）")
+        except ValueError:
+            parser.error("十六进制密文格式错误")
+    return 0
+
+
+def cmd_file(args, parser):
+    """文件加密解密（参数同 sdes_fileio.py）"""
+    from sdes_fileio import main as fileio_main
+    return fileio_main(args.args)
+
+
+def cmd_analyze(args, parser):
+    """全密钥空间分析（参数同 sdes_analysis.py）"""
+    from sdes_analysis import main as analysis_main
+    return analysis_main(args.args)
+
+
+def cmd_crack(args, parser):
+    """密钥恢复：单对暴力搜索、多对求交、三重S-DES搜索、仅密文攻击或已知片段拖动搜索"""
+    if args.crib is not None:
+        if not args.input:
+            parser.error("--crib 需要 --input 指定密文文件")
+        from sdes_attacks import crib_search
+        hits = 0
+        with open(args.input, 'rb') as f:
+            for offset, key in crib_search(f, args.crib):
+                print(f"{offset} {key}")
+                hits += 1
+        print(f"命中 {hits} 处", file=sys.stderr)
+        return 0
+
+    if args.ciphertext_only:
+        from sdes_attacks import ciphertext_only_attack
+        with open(args.ciphertext_only, 'rb') as f:
+            result = ciphertext_only_attack(f, top=args.top)
+        print(f"密文 {result['bytes']} 字节 ({result['distinct_bytes']} 种), 用时 {result['time']:.4f}秒",
+              file=sys.stderr)
+        for key, score in zip(result["keys"], result["scores"]):
+            print(f"{key} {score:.3f}")
+        return 0
+
+    if (args.triple or args.three_keys) and not args.pairs:
+        parser.error("三重S-DES搜索需要 --pairs 指定明密文对文件")
+    if args.pairs:
+        with open(args.pairs, encoding='utf-8') as f:
+            from sdes_keyindex import parse_pairs
+            pairs = parse_pairs(f.read())
+
+        if args.triple or args.three_keys:
+            from sdes_search import TripleKeySearch
+            search = TripleKeySearch(pairs, three_keys=args.three_keys, workers=args.workers,
+                                     checkpoint_path=args.checkpoint, table_cache=args.table_cache)
+            result = search.run(progress=lambda checked, total, rate: print(
+                f"进度: {checked / total * 100:.1f}%, {rate:.0f} 密钥/秒", file=sys.stderr, flush=True))
+            print(f"用时: {result['time']:.2f}秒, 找到 {len(result['keys'])} 个候选密钥")
+            for key in result["keys"]:
+                print(key)
+            return 0
+
+        if args.table_cache:
+            from sdes_tablecache import load_index
+            index = load_index(args.table_cache)
+        else:
+            from sdes_keyindex import KnownPlaintextIndex
+            index = KnownPlaintextIndex()
+        result = index.recover_keys(pairs)
+        print(f"使用明密文对: {result['pairs_used']}/{result['pairs_total']}")
+        print(f"候选数变化: {' -> '.join(map(str, result['history']))}")
+        for key in result["keys"]:
+            print(key)
+        return 0
+
+    if not args.plaintext or not args.ciphertext:
+        parser.error("需要提供明文和密文，或使用 --pairs 指定明密文对文件")
+    _check_block(parser, args.plaintext, "明文")
+    _check_block(parser, args.ciphertext, "密文")
+
+    from sdes_algorithm import SDES
+    start_time = time.perf_counter()
+    keys = list(SDES().search_keys(args.plaintext, args.ciphertext, first_only=args.first))
+    elapsed = time.perf_counter() - start_time
+    for key in keys:
+        print(key)
+    print(f"找到 {len(keys)} 个密钥, 用时 {elapsed:.4f}秒", file=sys.stderr)
+    return 0
+
+
+def measure_startup(runs: int = 5) -> dict:
+    """测量命令行冷启动到首次输出的时间（启动新解释器执行一次分组加密）"""
+    import subprocess
+    command = [sys.executable, __file__, "block", "encrypt", "10111101", "--key", "1010000010"]
+    timings = []
+    for _ in range(runs):
+        start_time = time.perf_counter()
+        process = subprocess.Popen(command, stdout=subprocess.PIPE)
+        process.stdout.readline()
+        timings.append(time.perf_counter() - start_time)
+        process.wait()
+    return {"runs": runs, "min": min(timings), "mean": sum(timings) / runs}
+
+
+def cmd_bench(args, parser):
+    """性能基准"""
+    if args.startup:
+        result = measure_startup(args.runs)
+        print(f"冷启动到首次输出: 最短 {result['min'] * 1000:.1f} ms, 平均 {result['mean'] * 1000:.1f} ms "
+              f"({result['runs']} 次)")
+        return 0
+
+    import os
+    from sdes_algorithm import SDES
+    sdes = SDES()
+    key = "1010000010"
+
+    start_time = time.perf_counter()
+    for block in range(256):
+        for _ in range(40):
+            sdes.encrypt_int(block, key)
+    elapsed = time.perf_counter() - start_time
+    print(f"整数分组加密: {256 * 40 / elapsed:.0f} 块/秒")
+
+    data = os.urandom(args.size)
+    start_time = time.perf_counter()
+    sdes.encrypt_bytes(data, key)
+    elapsed = time.perf_counter() - start_time
+    print(f"字节批量加密: {len(data) / elapsed / 1e6:.1f} MB/s")
+
+    list(sdes.search_keys("10111101", "10000111"))
+    start_time = time.perf_counter()
+    for _ in range(20):
+        list(sdes.search_keys("10111101", "10000111"))
+    elapsed = (time.perf_counter() - start_time) / 20
+    print(f"暴力破解: {1024 / elapsed:.0f} 密钥/秒")
+    return 0
+
+
+def cmd_gui(args, parser):
+    """启动图形界面"""
+    from sdes_main import run_gui
+    run_gui()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """构建命令行参数解析器"""
+    parser = argparse.ArgumentParser(prog="sdes", description="S-DES命令行工具")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.required = True
+
+    block = subparsers.add_parser("block", help="加密/解密8位数据块")
+    block.add_argument("action", choices=("encrypt", "decrypt"))
+    block.add_argument("block", help="8位二进制数据块")
+    block.add_argument("--key", required=True, help="10位二进制密钥")
+    block.set_defaults(handler=cmd_block)
+
+    text = subparsers.add_parser("text", help="加密/解密UTF-8文本")
+    text.add_argument("action", choices=("encrypt", "decrypt"))
+    text.add_argument("text", help="文本（解密时为十六进制密文）")
+    text.add_argument("--key", required=True, help="10位二进制密钥")
+    text.add_argument("--raw", action="store_true", help="密文按字符（码位0-255）表示而非十六进制")
+    # 旧参数：十六进制已是默认行为
+    text.add_argument("--hex", action="store_true", help=argparse.SUPPRESS)
+    text.set_defaults(handler=cmd_text)
+
+    file = subparsers.add_parser("file", help="加密/解密文件（参数同 sdes_fileio.py）", add_help=False)
+    file.add_argument("args", nargs=argparse.REMAINDER)
+    file.set_defaults(handler=cmd_file)
+
+    analyze = subparsers.add_parser("analyze", help="全密钥空间分析（参数同 sdes_analysis.py）", add_help=False)
+    analyze.add_argument("args", nargs=argparse.REMAINDER)
+    analyze.set_defaults(handler=cmd_analyze)
+
+    crack = subparsers.add_parser("crack", help="已知明文恢复密钥")
+    crack.add_argument("plaintext", nargs="?", help="8位二进制明文")
+    crack.add_argument("ciphertext", nargs="?", help="8位二进制密文")
+    crack.add_argument("--first", action="store_true", help="找到第一个密钥即停止")
+    crack.add_argument("--pairs", help="明密文对文件（每行: 明文 密文）")
+    crack.add_argument("--triple", action="store_true", help="三重S-DES双密钥模式（需--pairs）")
+    crack.add_argument("--three-keys", action="store_true", help="三重S-DES三密钥模式（需--pairs）")
+    crack.add_argument("--workers", type=int, default=None, help="三重搜索的工作进程数")
+    crack.add_argument("--checkpoint", default=None, help="三重搜索的检查点文件")
+    crack.add_argument("--table-cache", default=None, help="码本/索引缓存文件（mmap加载，不存在时自动生成）")
+    crack.add_argument("--ciphertext-only", metavar="FILE", help="仅密文攻击：按字节频率为全部密钥打分排序")
+    crack.add_argument("--top", type=int, default=10, help="仅密文攻击输出的候选密钥数")
+    crack.add_argument("--crib", help="已知明文片段（UTF-8），在--input密文中拖动搜索其位置和密钥")
+    crack.add_argument("--input", help="--crib搜索的ECB密文文件（流式读取）")
+    crack.set_defaults(handler=cmd_crack)
+
+    bench = subparsers.add_parser("bench", help="性能基准")
+    bench.add_argument("--startup", action="store_true", help="测量冷启动到首次输出的时间")
+    bench.add_argument("--runs", type=int, default=5, help="冷启动测量次数")
+    bench.add_argument("--size", type=int, default=16 * 1024 * 1024, help="字节加密基准的数据量")
+    bench.set_defaults(handler=cmd_bench)
+
+    gui = subparsers.add_parser("gui", help="启动图形界面")
+    gui.set_defaults(handler=cmd_gui)
+
+    return parser
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    return args.handler(args, parser)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
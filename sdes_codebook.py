@@ -0,0 +1,191 @@
+"""
+S-DES全码本查找表引擎
+"""
+
+import time
+from typing import Optional
+
+from sdes_algorithm import SDES, PreparedKey, KeyLike
+
+
+class CodebookEngine:
+    """S-DES全码本引擎：预先计算1024个密钥 × 256个数据块的加密/解密结果
+
+    按行模式只为用到的密钥各保存一对256字节的行；完整码本模式（或调用build_all后）
+    使用两张连续的 1024 × 256 字节表，encrypt_table/decrypt_table 仅在此时可用。
+    """
+
+    KEY_COUNT = 1024
+    BLOCK_COUNT = 256
+
+    def __init__(self, sdes: Optional[SDES] = None, lazy_rows: bool = True):
+        # lazy_rows为True时按密钥逐行生成，否则首次使用时一次性生成完整码本
+        self.sdes = sdes or SDES()
+        self.lazy_rows = lazy_rows
+
+        self.encrypt_table = None
+        self.decrypt_table = None
+        # 按行模式下已生成的行（生成完整码本后并入连续表）
+        self.encrypt_rows = {}
+        self.decrypt_rows = {}
+        self.row_built = None
+        self.rows_built = 0
+        self.build_time = 0.0
+
+    def _allocate(self):
+        """分配完整码本存储（每个方向 1024 × 256 字节），并入已按行生成的结果"""
+        size = self.KEY_COUNT * self.BLOCK_COUNT
+        self.encrypt_table = bytearray(size)
+        self.decrypt_table = bytearray(size)
+        if self.row_built is None:
+            self.row_built = bytearray(self.KEY_COUNT)
+        for key, row in self.encrypt_rows.items():
+            base = key << 8
+            self.encrypt_table[base:base + self.BLOCK_COUNT] = row
+            self.decrypt_table[base:base + self.BLOCK_COUNT] = self.decrypt_rows[key]
+        self.encrypt_rows, self.decrypt_rows = {}, {}
+
+    def _key_index(self, key: KeyLike) -> int:
+        """将密钥参数转换为0-1023的整数"""
+        if isinstance(key, int):
+            if not 0 <= key < self.KEY_COUNT:
+                raise ValueError("密钥必须是10位")
+            return key
+        if isinstance(key, PreparedKey):
+            return key.key
+        return self.sdes.prepare_key(key).key
+
+    def _block_index(self, block: int) -> int:
+        """检查8位整数数据块的取值范围（越界会读到相邻密钥的码本行）"""
+        if not 0 <= block < self.BLOCK_COUNT:
+            raise ValueError("数据块必须是8位")
+        return block
+
+    def _fill_row(self, key: int):
+        """计算单个密钥的加密行和解密行"""
+        feistel = self.sdes._feistel_int
+        k1, k2 = self.sdes.generate_subkeys_int(key)
+        row = bytes(feistel(block, k1, k2) for block in range(self.BLOCK_COUNT))
+        inverse = bytearray(self.BLOCK_COUNT)
+        for block, encrypted in enumerate(row):
+            inverse[encrypted] = block
+
+        if self.encrypt_table is None:
+            # 按行模式：每个密钥单独保存
+            self.encrypt_rows[key] = row
+            self.decrypt_rows[key] = bytes(inverse)
+        else:
+            base = key << 8
+            self.encrypt_table[base:base + self.BLOCK_COUNT] = row
+            self.decrypt_table[base:base + self.BLOCK_COUNT] = inverse
+
+        self.row_built[key] = 1
+        self.rows_built += 1
+
+    def build_row(self, key: KeyLike):
+        """按需生成单个密钥的码本行"""
+        key = self._key_index(key)
+        if self.row_built is None:
+            self.row_built = bytearray(self.KEY_COUNT)
+        if self.row_built[key]:
+            return
+
+        start_time = time.perf_counter()
+        self._fill_row(key)
+        self.build_time += time.perf_counter() - start_time
+
+    @classmethod
+    def full(cls, sdes: Optional[SDES] = None) -> 'CodebookEngine':
+        """创建并生成完整码本的引擎"""
+        return cls(sdes, lazy_rows=False).build_all()
+
+    def build_all(self) -> 'CodebookEngine':
+        """生成完整码本（已生成的行会跳过），返回引擎本身"""
+        if self.encrypt_table is None:
+            self._allocate()
+
+        start_time = time.perf_counter()
+        for key in range(self.KEY_COUNT):
+            if not self.row_built[key]:
+                self._fill_row(key)
+        self.build_time += time.perf_counter() - start_time
+        return self
+
+    def attach_tables(self, encrypt_table, decrypt_table):
+        """使用外部提供的完整码本（如mmap映射的缓存文件），不再自行计算"""
+        size = self.KEY_COUNT * self.BLOCK_COUNT
+        if len(encrypt_table) != size or len(decrypt_table) != size:
+            raise ValueError(f"码本大小必须为 {size} 字节")
+        self.encrypt_table = encrypt_table
+        self.decrypt_table = decrypt_table
+        self.encrypt_rows, self.decrypt_rows = {}, {}
+        self.row_built = b'\x01' * self.KEY_COUNT
+        self.rows_built = self.KEY_COUNT
+
+    def _ensure_row(self, key: int):
+        """保证密钥所在行可用"""
+        if self.row_built is None or not self.row_built[key]:
+            if self.lazy_rows:
+                self.build_row(key)
+            else:
+                self.build_all()
+
+    def encrypt_int(self, block: int, key: KeyLike) -> int:
+        """加密8位整数数据块（查表）"""
+        block = self._block_index(block)
+        key = self._key_index(key)
+        self._ensure_row(key)
+        if self.encrypt_table is None:
+            return self.encrypt_rows[key][block]
+        return self.encrypt_table[(key << 8) | block]
+
+    def decrypt_int(self, block: int, key: KeyLike) -> int:
+        """解密8位整数数据块（查表）"""
+        block = self._block_index(block)
+        key = self._key_index(key)
+        self._ensure_row(key)
+        if self.decrypt_table is None:
+            return self.decrypt_rows[key][block]
+        return self.decrypt_table[(key << 8) | block]
+
+    def encrypt_block(self, plaintext: str, key: KeyLike) -> str:
+        """加密单个8位数据块（与SDES.encrypt_block接口一致）"""
+        return format(self.encrypt_int(int(plaintext.zfill(8), 2), key), '08b')
+
+    def decrypt_block(self, ciphertext: str, key: KeyLike) -> str:
+        """解密单个8位数据块（与SDES.decrypt_block接口一致）"""
+        return format(self.decrypt_int(int(ciphertext.zfill(8), 2), key), '08b')
+
+    def encrypt_row(self, key: KeyLike) -> memoryview:
+        """返回密钥对应的256字节加密行"""
+        key = self._key_index(key)
+        self._ensure_row(key)
+        if self.encrypt_table is None:
+            return memoryview(self.encrypt_rows[key])
+        return memoryview(self.encrypt_table)[key << 8:(key + 1) << 8]
+
+    def decrypt_row(self, key: KeyLike) -> memoryview:
+        """返回密钥对应的256字节解密行"""
+        key = self._key_index(key)
+        self._ensure_row(key)
+        if self.decrypt_table is None:
+            return memoryview(self.decrypt_rows[key])
+        return memoryview(self.decrypt_table)[key << 8:(key + 1) << 8]
+
+    def memory_usage(self) -> int:
+        """码本数据占用的字节数（按行模式只计已生成的行，不含Python对象开销）"""
+        if self.row_built is None:
+            return 0
+        if self.encrypt_table is None:
+            return 2 * self.BLOCK_COUNT * len(self.encrypt_rows) + len(self.row_built)
+        return len(self.encrypt_table) + len(self.decrypt_table) + len(self.row_built)
+
+    def stats(self) -> dict:
+        """获取码本构建统计信息"""
+        return {
+            "mode": "lazy_rows" if self.lazy_rows else "full",
+            "rows_built": self.rows_built,
+            "total_rows": self.KEY_COUNT,
+            "build_time": self.build_time,
+            "memory_bytes": self.memory_usage()
+        }
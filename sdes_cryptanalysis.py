@@ -0,0 +1,323 @@
+"""
+S-DES差分与线性密码分析：S盒差分分布表/线性逼近表、特征传播、选择明文与已知明文攻击
+"""
+
+import time
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+
+from sdes_algorithm import SDES
+from sdes_vectorized import VectorizedSDES
+
+
+Oracle = Callable[[np.ndarray], np.ndarray]
+
+# 4位整数的奇偶校验位
+PARITY = np.array([bin(value).count('1') & 1 for value in range(16)], dtype=np.uint8)
+
+# 差分攻击默认依次使用的左半部分输入差分（IP之后）
+DEFAULT_DELTAS = (0b1000, 0b0100, 0b0010, 0b0001, 0b1100, 0b0110, 0b0011, 0b1001)
+
+
+def s_box_table(s_box: Sequence[Sequence[int]]) -> np.ndarray:
+    """4位输入 -> 2位输出的S盒查找数组（第1、4位为行，第2、3位为列）"""
+    return np.array([SDES._s_box_int(x, s_box) for x in range(16)], dtype=np.uint8)
+
+
+def _sp_tables(sdes: SDES):
+    """SP置换及其逆置换的4位查找数组"""
+    sp = np.array(SDES._permutation_table(sdes.SP, 4), dtype=np.uint8)
+    return sp, np.argsort(sp).astype(np.uint8)
+
+
+def difference_distribution_table(s_box: Sequence[Sequence[int]]) -> np.ndarray:
+    """S盒差分分布表：ddt[输入差分, 输出差分] 为满足该差分的输入个数（16 × 4）"""
+    table = s_box_table(s_box)
+    inputs = np.arange(16)
+    deltas = inputs[:, None]
+    outputs = table[inputs] ^ table[inputs ^ deltas]
+    return np.bincount((deltas * 4 + outputs).ravel(), minlength=64).reshape(16, 4)
+
+
+def f_difference_table(sdes: Optional[SDES] = None) -> np.ndarray:
+    """轮函数F的差分转移概率 table[ΔR, ΔF]（16 × 16）：EP扩展 -> S1/S2差分分布 -> SP置换"""
+    sdes = sdes or SDES()
+    sp, _ = _sp_tables(sdes)
+    ddt1 = difference_distribution_table(sdes.S1) / 16
+    ddt2 = difference_distribution_table(sdes.S2) / 16
+
+    # EP是线性的，输入差分直接扩展为S盒输入差分，与子密钥无关
+    expanded = np.array(sdes.ep_table)
+    joint = ddt1[expanded >> 4][:, :, None] * ddt2[expanded & 0xF][:, None, :]
+    outputs = sp[(np.arange(4)[:, None] << 2) | np.arange(4)[None, :]]
+
+    table = np.zeros((16, 16))
+    np.add.at(table, (np.arange(16)[:, None, None], outputs[None, :, :]), joint)
+    return table
+
+
+def cipher_difference_table(sdes: Optional[SDES] = None) -> np.ndarray:
+    """两轮S-DES的差分转移概率 table[Δ明文, Δ密文]（256 × 256，假设两轮子密钥独立均匀）"""
+    sdes = sdes or SDES()
+    f_table = f_difference_table(sdes)
+
+    # IP之后：左a、右b；第一轮F输出差分f1，第二轮f2
+    a, b, f1, f2 = np.meshgrid(*(np.arange(16),) * 4, indexing='ij')
+    probability = f_table[b, f1] * f_table[a ^ f1, f2]
+    inputs = (a << 4) | b
+    outputs = ((b ^ f2) << 4) | (a ^ f1)
+
+    table = np.zeros((256, 256))
+    np.add.at(table, (inputs.ravel(), outputs.ravel()), probability.ravel())
+
+    # IP和IP^-1是位置换，差分同样按位置换传递
+    ip = np.array(sdes.ip_table)
+    return table[ip][:, ip]
+
+
+def linear_approximation_table(s_box: Sequence[Sequence[int]]) -> np.ndarray:
+    """S盒线性逼近表：lat[输入掩码a, 输出掩码b] = #{x : a·x = b·S(x)} - 8（16 × 4）"""
+    table = s_box_table(s_box)
+    inputs = np.arange(16)
+    masks_in = inputs[:, None, None]
+    masks_out = np.arange(4)[None, :, None]
+    agree = PARITY[masks_in & inputs] == PARITY[masks_out & table[inputs]]
+    return agree.sum(axis=2) - 8
+
+
+def _nibble_scores(inputs: np.ndarray, outputs: np.ndarray, lat: np.ndarray) -> np.ndarray:
+    """一个S盒对应的4位子密钥的16个候选得分（Matsui算法1：由偏差符号估计子密钥位的奇偶性）
+
+    对每组掩码(a, b)，近似式 a·(x ^ k) = b·S(x ^ k) 以概率 1/2 + lat[a, b]/16 成立。
+    统计全部明密文对中 a·x ^ b·y 为1的比例，与各候选k的预测偏差做相关，正确子密钥得分最高。
+    """
+    masks_in = np.arange(16)[:, None, None]
+    masks_out = np.arange(4)[None, :, None]
+    ones = (PARITY[masks_in & inputs] ^ PARITY[masks_out & outputs]).mean(axis=2)
+
+    # a·k = 0 时近似式成立的比例为 1 - ones，否则为 ones
+    key_parity = PARITY[np.arange(16)[:, None] & np.arange(16)[None, :]]
+    observed = np.where(key_parity[:, :, None], ones[None], 1 - ones[None]) - 0.5
+    return (observed * (lat / 16)[None]).sum(axis=(1, 2))
+
+
+def linear_attack(plaintexts, ciphertexts, sdes: Optional[SDES] = None, batch: int = 16) -> dict:
+    """已知明文线性攻击：分别估计两轮四个S盒的4位子密钥得分，合成全部密钥的排名后依次验证
+
+    两轮S-DES中每轮F的输入和输出都能由明文、密文（经IP）直接算出，因此单个S盒的线性
+    逼近就能用于两轮子密钥；全部明密文对以数组方式处理，不逐对循环。
+    """
+    sdes = sdes or SDES()
+    start_time = time.perf_counter()
+    plaintexts = np.asarray(plaintexts, dtype=np.uint8)
+    ciphertexts = np.asarray(ciphertexts, dtype=np.uint8)
+    if not len(plaintexts):
+        raise ValueError("至少需要一组明密文对")
+
+    _, sp_inv = _sp_tables(sdes)
+    ip = np.array(sdes.ip_table, dtype=np.uint8)
+    expand = np.array(sdes.ep_table, dtype=np.uint8)
+    lat1, lat2 = linear_approximation_table(sdes.S1), linear_approximation_table(sdes.S2)
+
+    before, after = ip[plaintexts], ip[ciphertexts]
+    left, right = before >> 4, before & 0xF
+    right_out, left_out = after >> 4, after & 0xF
+
+    scores = []
+    # 第一轮：F(R, K1) = L ^ L1；第二轮：F(L1, K2) = R ^ R2
+    for x, y in ((expand[right], sp_inv[left ^ left_out]), (expand[left_out], sp_inv[right ^ right_out])):
+        scores.append((_nibble_scores(x >> 4, y >> 2, lat1), _nibble_scores(x & 0xF, y & 0b11, lat2)))
+
+    engine = VectorizedSDES(sdes)
+    k1, k2 = engine.k1_table, engine.k2_table
+    total = (scores[0][0][k1 >> 4] + scores[0][1][k1 & 0xF]
+             + scores[1][0][k2 >> 4] + scores[1][1][k2 & 0xF])
+    ranking = np.argsort(-total, kind='stable').astype(np.uint16)
+
+    # 按得分从高到低分批验证，直到找到与全部明密文对一致的密钥
+    keys, rank = [], None
+    for start in range(0, len(ranking), batch):
+        candidates = ranking[start:start + batch]
+        trial = engine.encrypt(*np.broadcast_arrays(plaintexts[None, :], candidates[:, None]))
+        matched = np.flatnonzero((trial == ciphertexts[None, :]).all(axis=1))
+        if len(matched):
+            keys = [format(int(candidates[i]), '010b') for i in matched]
+            rank = start + int(matched[0]) + 1
+            break
+
+    return {
+        "keys": keys,
+        "rank": rank,
+        "pairs": len(plaintexts),
+        "trial_keys": rank if rank is not None else len(ranking),
+        "time": time.perf_counter() - start_time
+    }
+
+
+def benchmark_linear_attack(pair_counts: Sequence[int] = (2, 4, 8, 16, 32), trials: int = 200,
+                            seed: int = 1) -> dict:
+    """统计不同已知明文数量下线性攻击的成功率（恢复出与真实密钥等价的密钥）、平均验证密钥数
+    与耗时，并与第4关暴力破解路径（search_keys）对比"""
+    sdes = SDES()
+    rng = np.random.default_rng(seed)
+    oracle_engine = VectorizedSDES(sdes)
+    keys = rng.integers(0, 1024, trials)
+
+    rows = []
+    for count in pair_counts:
+        successes, trial_keys, elapsed = 0, 0, 0.0
+        for key in keys:
+            plaintexts = rng.integers(0, 256, count, dtype=np.uint8)
+            ciphertexts = oracle_engine.encrypt(plaintexts, int(key))
+            result = linear_attack(plaintexts, ciphertexts, sdes)
+            # 明密文对太少时排在前面的可能是另一个恰好一致的密钥
+            codebook = sdes.prepare_key(int(key)).encrypt_table
+            successes += bool(result["keys"]) and sdes.prepare_key(result["keys"][0]).encrypt_table == codebook
+            trial_keys += result["trial_keys"]
+            elapsed += result["time"]
+        rows.append({
+            "pairs": count,
+            "success_rate": successes / trials,
+            "mean_trial_keys": trial_keys / trials,
+            "time": elapsed / trials
+        })
+
+    plaintext = "10111101"
+    start_time = time.perf_counter()
+    for key in keys[:20]:
+        list(sdes.search_keys(plaintext, sdes.encrypt_block(plaintext, format(int(key), '010b'))))
+    brute_force_time = (time.perf_counter() - start_time) / min(trials, 20)
+
+    return {"trials": trials, "rows": rows, "brute_force_keys": 1024, "brute_force_time": brute_force_time}
+
+
+def encryption_oracle(key, sdes: Optional[SDES] = None) -> Oracle:
+    """选择明文预言机：用（攻击者未知的）密钥批量加密uint8明文数组"""
+    engine = VectorizedSDES(sdes)
+    return lambda blocks: engine.encrypt(blocks, key)
+
+
+def differential_attack(oracle: Oracle, sdes: Optional[SDES] = None, deltas: Sequence[int] = DEFAULT_DELTAS,
+                        pairs_per_delta: int = 2, seed: Optional[int] = None) -> dict:
+    """选择明文差分攻击：先恢复第二轮子密钥K2，再由密钥扩展得到完整密钥
+
+    明文对在IP之后右半部分相同、左半部分相差δ，于是第一轮F输出相同，第二轮F的输入差分
+    确定为δ，输出差分可由密文直接读出。经SP^-1拆成S1、S2各自的输出差分后，对K2的两个
+    4位部分分别计数，只保留与全部明文对一致的候选；两部分都唯一时提前停止。
+    """
+    sdes = sdes or SDES()
+    start_time = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    s1, s2 = s_box_table(sdes.S1), s_box_table(sdes.S2)
+    _, sp_inv = _sp_tables(sdes)
+    ip = np.array(sdes.ip_table, dtype=np.uint8)
+    ip_inv = np.array(sdes.ip_inv_table, dtype=np.uint8)
+    expand = np.array(sdes.ep_table, dtype=np.uint8)
+    subkeys = np.arange(16, dtype=np.uint8)
+
+    alive_high = np.ones(16, dtype=bool)
+    alive_low = np.ones(16, dtype=bool)
+    plaintexts, ciphertexts = [], []
+    sbox_lookups = 0
+
+    for delta in deltas:
+        # 选择明文：IP后的值u与 u ^ (δ << 4)
+        first = rng.integers(0, 256, pairs_per_delta, dtype=np.uint8)
+        second = first ^ np.uint8(delta << 4)
+        blocks = ip_inv[np.concatenate([first, second])]
+        encrypted = np.asarray(oracle(blocks), dtype=np.uint8)
+        plaintexts.append(blocks)
+        ciphertexts.append(encrypted)
+
+        output = ip[encrypted]
+        output, output_pair = output[:pairs_per_delta], output[pairs_per_delta:]
+        # 第二轮F的输入（IP(密文)低4位）与输出差分（高4位差分，右半部分无差分）
+        x, x_pair = expand[output & 0xF], expand[output_pair & 0xF]
+        observed = sp_inv[(output >> 4) ^ (output_pair >> 4)]
+
+        predicted_high = s1[(x >> 4)[:, None] ^ subkeys] ^ s1[(x_pair >> 4)[:, None] ^ subkeys]
+        predicted_low = s2[(x & 0xF)[:, None] ^ subkeys] ^ s2[(x_pair & 0xF)[:, None] ^ subkeys]
+        alive_high &= (predicted_high == (observed >> 2)[:, None]).all(axis=0)
+        alive_low &= (predicted_low == (observed & 0b11)[:, None]).all(axis=0)
+        sbox_lookups += 4 * 16 * pairs_per_delta
+
+        if alive_high.sum() <= 1 and alive_low.sum() <= 1:
+            break
+
+    k2_candidates = [(int(high) << 4) | int(low)
+                     for high in np.flatnonzero(alive_high) for low in np.flatnonzero(alive_low)]
+
+    # 与候选K2一致的10位密钥，用已查询的明密文对验证
+    engine = VectorizedSDES(sdes)
+    keys = np.flatnonzero(np.isin(engine.k2_table, k2_candidates)).astype(np.uint16)
+    plaintexts, ciphertexts = np.concatenate(plaintexts), np.concatenate(ciphertexts)
+    trial = engine.encrypt(*np.broadcast_arrays(plaintexts[None, :], keys[:, None]))
+    matches = keys[(trial == ciphertexts[None, :]).all(axis=1)]
+
+    return {
+        "keys": [format(int(key), '010b') for key in matches],
+        "k2_candidates": [format(k2, '08b') for k2 in k2_candidates],
+        "queries": len(plaintexts),
+        "sbox_lookups": sbox_lookups,
+        "trial_encryptions": int(trial.size),
+        # 穷举搜索最坏情况需要对全部密钥各加密一次
+        "brute_force_encryptions": 1024,
+        "time": time.perf_counter() - start_time
+    }
+
+
+def benchmark_differential_attack(trials: int = 200, seed: int = 1) -> dict:
+    """对随机密钥重复差分攻击，统计查询次数、运算量与成功率，并与暴力搜索对比耗时"""
+    sdes = SDES()
+    rng = np.random.default_rng(seed)
+    keys = rng.integers(0, 1024, trials)
+
+    results: List[dict] = []
+    successes = 0
+    start_time = time.perf_counter()
+    for index, key in enumerate(keys):
+        result = differential_attack(encryption_oracle(int(key), sdes), sdes, seed=seed + index)
+        codebook = sdes.prepare_key(int(key)).encrypt_table
+        successes += any(sdes.prepare_key(found).encrypt_table == codebook for found in result["keys"])
+        results.append(result)
+    attack_time = (time.perf_counter() - start_time) / trials
+
+    # 暴力搜索：一对已知明密文 + 逐个密钥加密
+    plaintext = 0b10111101
+    start_time = time.perf_counter()
+    for key in keys[:20]:
+        ciphertext = sdes.encrypt_int(plaintext, int(key))
+        [k for k in range(1024) if sdes.encrypt_int(plaintext, k) == ciphertext]
+    brute_force_time = (time.perf_counter() - start_time) / min(trials, 20)
+
+    def mean(name):
+        return sum(result[name] for result in results) / trials
+
+    return {
+        "trials": trials,
+        "success_rate": successes / trials,
+        "mean_queries": mean("queries"),
+        "mean_sbox_lookups": mean("sbox_lookups"),
+        "mean_trial_encryptions": mean("trial_encryptions"),
+        "mean_candidate_keys": sum(len(result["keys"]) for result in results) / trials,
+        "attack_time": attack_time,
+        "brute_force_encryptions": 1024,
+        "brute_force_time": brute_force_time
+    }
+
+
+if __name__ == "__main__":
+    stats = benchmark_differential_attack()
+    print(f"差分攻击 ({stats['trials']} 个随机密钥): 成功率 {stats['success_rate'] * 100:.0f}%")
+    print(f"  平均选择明文查询: {stats['mean_queries']:.1f}")
+    print(f"  平均S盒查表: {stats['mean_sbox_lookups']:.0f}, 验证加密: {stats['mean_trial_encryptions']:.1f}")
+    print(f"  平均剩余候选密钥: {stats['mean_candidate_keys']:.2f}, 用时 {stats['attack_time'] * 1000:.2f} ms")
+    print(f"暴力搜索: {stats['brute_force_encryptions']} 次加密, 用时 {stats['brute_force_time'] * 1000:.2f} ms")
+
+    linear = benchmark_linear_attack()
+    print(f"线性攻击 ({linear['trials']} 个随机密钥):")
+    for row in linear["rows"]:
+        print(f"  {row['pairs']:3d} 对已知明文: 成功率 {row['success_rate'] * 100:5.1f}%, "
+              f"平均验证 {row['mean_trial_keys']:6.1f} 个密钥, 用时 {row['time'] * 1000:.2f} ms")
+    print(f"暴力搜索 (search_keys): {linear['brute_force_keys']} 个密钥, 用时 {linear['brute_force_time'] * 1000:.2f} ms")
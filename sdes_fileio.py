@@ -0,0 +1,238 @@
+"""
+S-DES文件加密解密：多进程分块处理，按顺序写回
+"""
+
+import argparse
+import mmap
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Union
+
+from sdes_algorithm import SDES, KeyLike
+from sdes_modes import MODES, new_encryptor, new_decryptor
+
+
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+INPLACE_SLICE_SIZE = 16 * 1024 * 1024
+
+# 各分块可以独立处理的模式（只依赖分块偏移量和前一个密文字节）
+PARALLEL_ENCRYPT_MODES = ('ecb', 'ctr', 'ofb')
+PARALLEL_DECRYPT_MODES = ('ecb', 'ctr', 'ofb', 'cbc', 'cfb')
+
+# 工作进程内的处理参数（由进程初始化函数设置）
+_worker_state = {}
+
+
+def _init_worker(key: int, mode: str, iv: Optional[int], decrypt: bool):
+    """工作进程初始化：每个进程只构建一次SDES查找表"""
+    _worker_state.update(sdes=SDES(), key=key, mode=mode, iv=iv, decrypt=decrypt)
+
+
+def process_chunk(sdes: SDES, key: KeyLike, mode: str, iv: Optional[int], decrypt: bool,
+                  offset: int, data: bytes, previous: Optional[int]) -> bytes:
+    """独立处理文件中位于offset处的一个分块
+
+    CBC/CFB解密时previous为分块前一个密文字节（首个分块为IV）。
+    """
+    if mode in ('cbc', 'cfb'):
+        if not decrypt:
+            raise ValueError(f"{mode.upper()}加密无法分块并行")
+        return new_decryptor(mode, key, iv=previous, sdes=sdes).update(data)
+
+    factory = new_decryptor if decrypt else new_encryptor
+    cipher = factory(mode, key, iv=iv if mode != 'ecb' else None, sdes=sdes)
+    cipher.position = offset
+    return cipher.update(data)
+
+
+def _run_chunk(task) -> bytes:
+    """进程池任务入口"""
+    offset, data, previous = task
+    state = _worker_state
+    return process_chunk(state['sdes'], state['key'], state['mode'], state['iv'], state['decrypt'],
+                         offset, data, previous)
+
+
+def _ordered_writer(out_file, futures: queue.Queue, errors: list):
+    """写线程：按提交顺序取出分块结果写入文件"""
+    while True:
+        future = futures.get()
+        if future is None:
+            return
+        try:
+            if not errors:
+                out_file.write(future.result())
+        except Exception as e:
+            errors.append(e)
+
+
+def _transform_file(src: str, dst: str, key: KeyLike, mode: str, iv: Union[int, bytes, None],
+                    decrypt: bool, workers: Optional[int], chunk_size: int,
+                    max_inflight: Optional[int]) -> dict:
+    mode = mode.lower()
+    if mode not in MODES:
+        raise ValueError(f"不支持的工作模式: {mode}（可选: {', '.join(MODES)}）")
+    # 以'wb'打开输出文件会先清空输入文件
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        raise ValueError("输出文件与输入文件相同，原地处理请使用encrypt_file_inplace/decrypt_file_inplace")
+
+    sdes = SDES()
+    key = sdes.prepare_key(key).key
+    # 借助处理器对象统一校验/生成IV
+    cipher = (new_decryptor if decrypt else new_encryptor)(mode, key, iv=iv, sdes=sdes)
+    iv = cipher.iv
+
+    workers = workers or os.cpu_count() or 1
+    parallel_modes = PARALLEL_DECRYPT_MODES if decrypt else PARALLEL_ENCRYPT_MODES
+    parallel = workers > 1 and mode in parallel_modes
+    max_inflight = max_inflight or 2 * workers
+
+    total = 0
+    start_time = time.perf_counter()
+    with open(src, 'rb') as in_file, open(dst, 'wb') as out_file:
+        if not parallel:
+            # 顺序流式处理，内存占用为一个分块
+            while True:
+                data = in_file.read(chunk_size)
+                if not data:
+                    break
+                out_file.write(cipher.update(data))
+                total += len(data)
+            out_file.write(cipher.finalize())
+        else:
+            futures = queue.Queue(maxsize=max_inflight)
+            errors = []
+            writer = threading.Thread(target=_ordered_writer, args=(out_file, futures, errors))
+            writer.start()
+            try:
+                with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                         initargs=(key, mode, iv, decrypt)) as pool:
+                    previous = iv
+                    while not errors:
+                        data = in_file.read(chunk_size)
+                        if not data:
+                            break
+                        # 队列已满时阻塞，限制在途分块数量
+                        futures.put(pool.submit(_run_chunk, (total, data, previous)))
+                        total += len(data)
+                        previous = data[-1]
+            finally:
+                futures.put(None)
+                writer.join()
+            if errors:
+                raise errors[0]
+
+    elapsed = time.perf_counter() - start_time
+    return {
+        "mode": mode,
+        "iv": iv,
+        "bytes": total,
+        "parallel": parallel,
+        "workers": workers if parallel else 1,
+        "time": elapsed,
+        "mb_per_sec": total / max(elapsed, 1e-9) / 1e6
+    }
+
+
+def encrypt_file(src: str, dst: str, key: KeyLike, mode: str = 'ctr', iv: Union[int, bytes, None] = None,
+                 workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 max_inflight: Optional[int] = None) -> dict:
+    """加密文件；ECB/CTR/OFB多进程并行，其余模式顺序处理。返回统计信息（含实际使用的IV）"""
+    return _transform_file(src, dst, key, mode, iv, False, workers, chunk_size, max_inflight)
+
+
+def decrypt_file(src: str, dst: str, key: KeyLike, mode: str = 'ctr', iv: Union[int, bytes, None] = None,
+                 workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 max_inflight: Optional[int] = None) -> dict:
+    """解密文件；ECB/CTR/OFB/CBC/CFB多进程并行。返回统计信息"""
+    return _transform_file(src, dst, key, mode, iv, True, workers, chunk_size, max_inflight)
+
+
+def _transform_file_inplace(path: str, key: KeyLike, mode: str, iv: Union[int, bytes, None],
+                            decrypt: bool, slice_size: int) -> dict:
+    factory = new_decryptor if decrypt else new_encryptor
+    cipher = factory(mode, key, iv=iv)
+
+    total = 0
+    start_time = time.perf_counter()
+    with open(path, 'r+b') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size:
+            with mmap.mmap(f.fileno(), 0) as mapped:
+                view = memoryview(mapped)
+                try:
+                    # 逐切片读取-转换-写回，内存占用与文件大小无关
+                    for start in range(0, size, slice_size):
+                        end = min(start + slice_size, size)
+                        cipher.update_into(view[start:end], view[start:end])
+                    mapped.flush()
+                finally:
+                    view.release()
+            total = size
+    cipher.finalize()
+
+    elapsed = time.perf_counter() - start_time
+    return {
+        "mode": cipher.mode,
+        "iv": cipher.iv,
+        "bytes": total,
+        "time": elapsed,
+        "mb_per_sec": total / max(elapsed, 1e-9) / 1e6
+    }
+
+
+def encrypt_file_inplace(path: str, key: KeyLike, mode: str = 'ctr', iv: Union[int, bytes, None] = None,
+                         slice_size: int = INPLACE_SLICE_SIZE) -> dict:
+    """通过mmap原地加密文件（所有模式均适用，按切片顺序处理）。返回统计信息（含实际使用的IV）"""
+    return _transform_file_inplace(path, key, mode, iv, False, slice_size)
+
+
+def decrypt_file_inplace(path: str, key: KeyLike, mode: str = 'ctr', iv: Union[int, bytes, None] = None,
+                         slice_size: int = INPLACE_SLICE_SIZE) -> dict:
+    """通过mmap原地解密文件。返回统计信息"""
+    return _transform_file_inplace(path, key, mode, iv, True, slice_size)
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="S-DES文件加密解密")
+    parser.add_argument("action", choices=("encrypt", "decrypt"), help="加密或解密")
+    parser.add_argument("src", help="输入文件")
+    parser.add_argument("dst", nargs="?", default=None, help="输出文件（与--in-place二选一）")
+    parser.add_argument("--key", required=True, help="10位二进制密钥")
+    parser.add_argument("--mode", default="ctr", choices=MODES, help="工作模式（默认ctr）")
+    parser.add_argument("--iv", type=lambda v: int(v, 0), default=None, help="IV/计数器初值（0-255，解密时必填）")
+    parser.add_argument("--workers", type=int, default=None, help="工作进程数（默认CPU核数）")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="分块大小（字节）")
+    parser.add_argument("--in-place", action="store_true", help="通过mmap原地处理输入文件")
+    args = parser.parse_args(argv)
+
+    if not SDES().validate_key(args.key):
+        parser.error("密钥必须是10位二进制")
+    if args.in_place == (args.dst is not None):
+        parser.error("必须且只能指定输出文件或--in-place之一")
+    if args.dst is not None and os.path.exists(args.dst) and os.path.samefile(args.src, args.dst):
+        parser.error("输出文件与输入文件相同，原地处理请使用--in-place")
+
+    if args.in_place:
+        function = encrypt_file_inplace if args.action == "encrypt" else decrypt_file_inplace
+        result = function(args.src, args.key, mode=args.mode, iv=args.iv)
+        how = "原地处理"
+    else:
+        function = encrypt_file if args.action == "encrypt" else decrypt_file
+        result = function(args.src, args.dst, args.key, mode=args.mode, iv=args.iv,
+                          workers=args.workers, chunk_size=args.chunk_size)
+        how = f"并行 {result['workers']} 进程" if result['parallel'] else "顺序处理"
+
+    if result["iv"] is not None:
+        print(f"IV: {result['iv']}")
+    print(f"处理 {result['bytes']} 字节, 用时 {result['time']:.2f}秒, {result['mb_per_sec']:.1f} MB/s, {how}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
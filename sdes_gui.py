@@ -3,10 +3,12 @@ S-DES图形用户界面
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
+from tkinter import ttk, messagebox, scrolledtext, filedialog
 import threading
 import time
 from sdes_algorithm import SDES
+from sdes_attacks import ciphertext_only_attack
+from sdes_keyindex import KnownPlaintextIndex, parse_pairs
 
 
 class SDESGUI:
@@ -28,6 +30,7 @@ class SDESGUI:
         # 暴力破解相关变量
         self.brute_force_thread = None
         self.stop_brute_force = False
+        self.key_index = None
         
         # 配置网格权重
         self.root.columnconfigure(0, weight=1)
@@ -176,8 +179,11 @@ class SDESGUI:
         ascii_decrypt_btn = ttk.Button(ascii_button_frame, text="🔓 ASCII解密", command=self.ascii_decrypt, style='Primary.TButton')
         ascii_decrypt_btn.grid(row=0, column=1, padx=5)
         
+        ascii_crack_btn = ttk.Button(ascii_button_frame, text="🔍 仅密文破解", command=self.ascii_ciphertext_only, style='Primary.TButton')
+        ascii_crack_btn.grid(row=0, column=2, padx=5)
+        
         ascii_clear_btn = ttk.Button(ascii_button_frame, text="🗑️ 清空", command=self.clear_ascii, style='Secondary.TButton')
-        ascii_clear_btn.grid(row=0, column=2, padx=5)
+        ascii_clear_btn.grid(row=0, column=3, padx=5)
         
         # 结果显示
         ascii_result_frame = ttk.LabelFrame(ascii_frame, text="ASCII处理结果", padding="10")
@@ -247,6 +253,20 @@ class SDESGUI:
         
         self.brute_result_text = scrolledtext.ScrolledText(brute_result_frame, height=8, width=70, font=('Courier', 9))
         self.brute_result_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        
+        # 多组明密文对恢复
+        pairs_frame = ttk.LabelFrame(brute_frame, text="多组明密文对（每行: 明文 密文）", padding="10")
+        pairs_frame.grid(row=5, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 15))
+        pairs_frame.columnconfigure(0, weight=1)
+        
+        self.pairs_text = scrolledtext.ScrolledText(pairs_frame, height=4, width=70, font=('Courier', 9))
+        self.pairs_text.grid(row=0, column=0, sticky=(tk.W, tk.E))
+        
+        pairs_button_frame = ttk.Frame(pairs_frame)
+        pairs_button_frame.grid(row=1, column=0, pady=(10, 0))
+        
+        ttk.Button(pairs_button_frame, text="🔑 多对恢复密钥", command=self.recover_from_pairs, style='Primary.TButton').grid(row=0, column=0, padx=5)
+        ttk.Button(pairs_button_frame, text="📂 从文件加载", command=self.load_pairs_file, style='Secondary.TButton').grid(row=0, column=1, padx=5)
     
     def create_info_tab(self):
         """创建算法信息选项卡"""
@@ -488,6 +508,35 @@ S-DES算法详细信息
             messagebox.showerror("错误", f"ASCII解密失败: {str(e)}")
             self.update_status("ASCII解密失败")
     
+    def ascii_ciphertext_only(self):
+        """只根据ASCII密文的字节频率推测密钥"""
+        try:
+            text = self.ascii_text_var.get()
+            if not text:
+                messagebox.showerror("错误", "请输入ASCII密文")
+                return
+            
+            self.update_status("正在进行仅密文攻击...")
+            result = ciphertext_only_attack(text, top=3)
+            
+            result_msg = f"[{time.strftime('%H:%M:%S')}] 仅密文攻击（{result['bytes']}字节, 用时{result['time']:.3f}秒）\n"
+            for key, score in zip(result['keys'], result['scores']):
+                try:
+                    preview = self.sdes.decrypt_ascii(text, key)
+                except UnicodeDecodeError:
+                    preview = "（不是有效的UTF-8）"
+                result_msg += f"密钥: {key}  得分: {score:.3f}  明文: '{preview[:40]}'\n"
+            result_msg += "-" * 50 + "\n"
+            
+            self.ascii_result_text.insert(tk.END, result_msg)
+            self.ascii_result_text.see(tk.END)
+            self.ascii_key_var.set(result['keys'][0])
+            self.update_status(f"仅密文攻击完成，最可能的密钥: {result['keys'][0]}")
+            
+        except Exception as e:
+            messagebox.showerror("错误", f"仅密文攻击失败: {str(e)}")
+            self.update_status("仅密文攻击失败")
+    
     def start_brute_force(self):
         """开始暴力破解"""
         try:
@@ -529,33 +578,20 @@ S-DES算法详细信息
     
     def brute_force_worker(self, plaintext: str, ciphertext: str):
         """暴力破解工作线程"""
-        import itertools
-        
         start_time = time.time()
         found_keys = []
-        total_keys = 1024
-        checked_keys = 0
+        
+        def on_progress(checked, total):
+            progress = (checked / total) * 100
+            self.root.after(0, lambda: self.progress_var.set(f"进度: {progress:.1f}% ({checked}/{total})"))
         
         try:
-            # 生成所有可能的10位密钥
-            for key_bits in itertools.product([0, 1], repeat=10):
-                if self.stop_brute_force:
-                    break
-                
-                checked_keys += 1
-                key = ''.join(map(str, key_bits))
-                
-                # 测试这个密钥
-                encrypted = self.sdes.encrypt_block(plaintext, key)
-                if encrypted == ciphertext:
-                    found_keys.append(key)
-                    self.root.after(0, lambda k=key: self.brute_result_text.insert(tk.END, f"找到密钥: {k}\n"))
-                    self.root.after(0, lambda: self.brute_result_text.see(tk.END))
-                
-                # 更新进度
-                if checked_keys % 100 == 0:
-                    progress = (checked_keys / total_keys) * 100
-                    self.root.after(0, lambda p=progress: self.progress_var.set(f"进度: {p:.1f}% ({checked_keys}/{total_keys})"))
+            for key in self.sdes.search_keys(plaintext, ciphertext,
+                                             should_stop=lambda: self.stop_brute_force,
+                                             progress=on_progress):
+                found_keys.append(key)
+                self.root.after(0, lambda k=key: self.brute_result_text.insert(tk.END, f"找到密钥: {k}\n"))
+                self.root.after(0, lambda: self.brute_result_text.see(tk.END))
             
             end_time = time.time()
             elapsed_time = end_time - start_time
@@ -574,6 +610,50 @@ S-DES算法详细信息
             self.root.after(0, lambda: messagebox.showerror("错误", f"暴力破解失败: {str(e)}"))
             self.root.after(0, self.brute_force_completed)
     
+    def load_pairs_file(self):
+        """从文件加载明密文对"""
+        path = filedialog.askopenfilename(title="选择明密文对文件", filetypes=[("文本文件", "*.txt"), ("所有文件", "*.*")])
+        if not path:
+            return
+        try:
+            with open(path, encoding='utf-8') as f:
+                content = f.read()
+            self.pairs_text.delete(1.0, tk.END)
+            self.pairs_text.insert(tk.END, content)
+            self.update_status(f"已加载明密文对文件: {path}")
+        except Exception as e:
+            messagebox.showerror("错误", f"文件读取失败: {str(e)}")
+    
+    def recover_from_pairs(self):
+        """用多组明密文对缩小候选密钥"""
+        try:
+            pairs = parse_pairs(self.pairs_text.get(1.0, tk.END))
+            if not pairs:
+                messagebox.showerror("错误", "请输入至少一组明密文对")
+                return
+            
+            self.update_status("正在恢复密钥...")
+            if self.key_index is None:
+                self.key_index = KnownPlaintextIndex()
+            result = self.key_index.recover_keys(pairs)
+            
+            result_msg = f"[{time.strftime('%H:%M:%S')}] 多对密钥恢复\n"
+            result_msg += f"使用明密文对: {result['pairs_used']}/{result['pairs_total']}\n"
+            result_msg += f"候选数变化: {' -> '.join(map(str, result['history']))}\n"
+            if result['keys']:
+                result_msg += f"候选密钥 ({len(result['keys'])}): {', '.join(result['keys'])}\n"
+            else:
+                result_msg += "没有密钥同时满足所有明密文对\n"
+            result_msg += "-" * 50 + "\n"
+            
+            self.brute_result_text.insert(tk.END, result_msg)
+            self.brute_result_text.see(tk.END)
+            self.update_status(f"密钥恢复完成，剩余{len(result['keys'])}个候选密钥")
+            
+        except Exception as e:
+            messagebox.showerror("错误", f"密钥恢复失败: {str(e)}")
+            self.update_status("密钥恢复失败")
+    
     def brute_force_completed(self):
         """暴力破解完成后的UI更新"""
         self.progress_bar.stop()
@@ -606,6 +686,7 @@ S-DES算法详细信息
         """清空暴力破解选项卡"""
         self.known_plaintext_var.set("")
         self.known_ciphertext_var.set("")
+        self.pairs_text.delete(1.0, tk.END)
         self.brute_result_text.delete(1.0, tk.END)
         self.progress_var.set("等待开始...")
         self.update_status("暴力破解选项卡已清空")
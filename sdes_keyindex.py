@@ -0,0 +1,260 @@
+"""
+S-DES已知明文密钥索引：(明文, 密文) -> 候选密钥集合
+"""
+
+import sys
+import time
+from array import array
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from sdes_codebook import CodebookEngine
+
+
+class KnownPlaintextIndex:
+    """已知明文索引：65536个(明文, 密文)槽位，以CSR(偏移量+密钥数组)紧凑存储候选密钥"""
+
+    SLOT_COUNT = 256 * 256
+    MAGIC = b'SDKIDX01'
+
+    def __init__(self, codebook: Optional[CodebookEngine] = None):
+        self.codebook = codebook
+        # offsets[slot] ~ offsets[slot+1] 为槽位 slot=(p<<8)|c 在keys中的区间
+        self.offsets = None
+        self.keys = None
+        self._bitsets = None
+        self.build_time = 0.0
+
+    @property
+    def is_built(self) -> bool:
+        """索引是否已可用"""
+        return self.offsets is not None
+
+    def build(self):
+        """由全码本构建索引（每个密钥对每个明文贡献一个槽位）"""
+        start_time = time.perf_counter()
+        self.codebook = CodebookEngine.full() if self.codebook is None else self.codebook.build_all()
+        encrypt_table = self.codebook.encrypt_table
+
+        # 按槽位分桶，密钥按升序加入，保证每个槽位内的密钥有序
+        buckets = [[] for _ in range(self.SLOT_COUNT)]
+        for key in range(CodebookEngine.KEY_COUNT):
+            base = key << 8
+            row = encrypt_table[base:base + 256]
+            for plaintext, ciphertext in enumerate(row):
+                buckets[(plaintext << 8) | ciphertext].append(key)
+
+        offsets = array('I', [0])
+        keys = array('H')
+        for bucket in buckets:
+            keys.extend(bucket)
+            offsets.append(len(keys))
+
+        self.offsets = offsets
+        self.keys = keys
+        self._bitsets = None
+        self.build_time = time.perf_counter() - start_time
+        return self
+
+    def _ensure_built(self):
+        if not self.is_built:
+            self.build()
+
+    @staticmethod
+    def _slot(plaintext: int, ciphertext: int) -> int:
+        """明密文对的槽位号（越界的数据块会落到其他明密文对的槽位上）"""
+        if not (0 <= plaintext < 256 and 0 <= ciphertext < 256):
+            raise ValueError("明文和密文必须是8位")
+        return (plaintext << 8) | ciphertext
+
+    def candidates(self, plaintext: int, ciphertext: int) -> List[int]:
+        """返回把明文加密为密文的所有密钥（升序）"""
+        self._ensure_built()
+        slot = self._slot(plaintext, ciphertext)
+        return self.keys[self.offsets[slot]:self.offsets[slot + 1]].tolist()
+
+    def count(self, plaintext: int, ciphertext: int) -> int:
+        """候选密钥数量"""
+        self._ensure_built()
+        slot = self._slot(plaintext, ciphertext)
+        return self.offsets[slot + 1] - self.offsets[slot]
+
+    def _slot_bitsets(self, start: int, stop: int) -> List[int]:
+        """槽位区间 [start, stop) 的候选密钥位集"""
+        self._ensure_built()
+        keys, offsets = self.keys, self.offsets
+        bitsets = []
+        for slot in range(start, stop):
+            value = 0
+            for key in keys[offsets[slot]:offsets[slot + 1]]:
+                value |= 1 << key
+            bitsets.append(value)
+        return bitsets
+
+    def bitsets(self) -> List[int]:
+        """全部槽位的1024位候选密钥位集（第k位表示密钥k），首次调用时生成"""
+        if self._bitsets is None:
+            self._bitsets = self._slot_bitsets(0, self.SLOT_COUNT)
+        return self._bitsets
+
+    def row_bitsets(self, plaintext: int) -> List[int]:
+        """明文固定时，256个密文各自的候选密钥位集（只生成这一行）"""
+        start = self._slot(plaintext, 0)
+        stop = start + 256
+        if self._bitsets is not None:
+            return self._bitsets[start:stop]
+        return self._slot_bitsets(start, stop)
+
+    def candidate_bitset(self, plaintext: int, ciphertext: int) -> int:
+        """候选密钥的1024位位集"""
+        return self.bitsets()[self._slot(plaintext, ciphertext)]
+
+    def _slot_array(self, pairs):
+        """把 N×2 明密文对数组转换为槽位数组，并返回索引偏移数组的NumPy视图（不复制）"""
+        import numpy as np
+        self._ensure_built()
+        pairs = np.asarray(pairs, dtype=np.intp).reshape(-1, 2)
+        if pairs.size and (pairs.min() < 0 or pairs.max() > 255):
+            raise ValueError("明文和密文必须是8位")
+        return (pairs[:, 0] << 8) | pairs[:, 1], np.frombuffer(self.offsets, dtype=np.uint32)
+
+    def candidates_csr(self, pairs) -> tuple:
+        """NumPy批量查询：返回 (bounds, keys)，第i对的候选密钥为 keys[bounds[i]:bounds[i+1]]
+
+        通过偏移数组整体收集，不为每一对创建Python对象；pairs为 N×2 数组（或可转换为数组的序列）。
+        """
+        import numpy as np
+        slots, offsets = self._slot_array(pairs)
+        starts = offsets[slots].astype(np.intp)
+        lengths = offsets[slots + 1].astype(np.intp) - starts
+        bounds = np.zeros(len(slots) + 1, dtype=np.intp)
+        np.cumsum(lengths, out=bounds[1:])
+        # 各区间首尾相接：全局位置减去区间在结果中的起点，加上区间在索引中的起点
+        positions = np.arange(bounds[-1]) + np.repeat(starts - bounds[:-1], lengths)
+        return bounds, np.frombuffer(self.keys, dtype=np.uint16)[positions]
+
+    @staticmethod
+    def _is_array(pairs) -> bool:
+        """是否为NumPy数组输入（此时走整体收集路径）"""
+        return getattr(pairs, 'ndim', None) == 2
+
+    def candidates_many(self, pairs: Iterable[Tuple[int, int]]) -> List[List[int]]:
+        """批量查询候选密钥（pairs为 N×2 NumPy数组时整体收集；需要数组结果请用candidates_csr）"""
+        self._ensure_built()
+        if self._is_array(pairs):
+            bounds, keys = self.candidates_csr(pairs)
+            flat, bounds = keys.tolist(), bounds.tolist()
+            return [flat[start:stop] for start, stop in zip(bounds, bounds[1:])]
+
+        keys, offsets = self.keys, self.offsets
+        result = []
+        for plaintext, ciphertext in pairs:
+            slot = self._slot(plaintext, ciphertext)
+            result.append(keys[offsets[slot]:offsets[slot + 1]].tolist())
+        return result
+
+    def count_many(self, pairs: Iterable[Tuple[int, int]]):
+        """批量查询候选密钥数量（pairs为 N×2 NumPy数组时整体收集并返回数组，否则返回列表）"""
+        self._ensure_built()
+        if self._is_array(pairs):
+            slots, offsets = self._slot_array(pairs)
+            return offsets[slots + 1] - offsets[slots]
+
+        offsets = self.offsets
+        result = []
+        for plaintext, ciphertext in pairs:
+            slot = self._slot(plaintext, ciphertext)
+            result.append(offsets[slot + 1] - offsets[slot])
+        return result
+
+    def recover_keys(self, pairs: Sequence[Tuple[int, int]]) -> dict:
+        """多组已知明密文对恢复密钥：依次与各对的候选位集求交，只剩一个密钥时停止"""
+        bitsets = self.bitsets()
+        candidates = (1 << CodebookEngine.KEY_COUNT) - 1
+        history = []
+
+        for plaintext, ciphertext in pairs:
+            candidates &= bitsets[self._slot(plaintext, ciphertext)]
+            history.append(bin(candidates).count('1'))
+            if history[-1] <= 1:
+                break
+
+        keys = [key for key in range(CodebookEngine.KEY_COUNT) if (candidates >> key) & 1]
+        return {
+            "keys": [format(key, '010b') for key in keys],
+            "unique": len(keys) == 1,
+            "pairs_used": len(history),
+            "pairs_total": len(pairs),
+            "history": history
+        }
+
+    def memory_usage(self) -> int:
+        """索引占用的字节数（不含位集缓存）"""
+        if not self.is_built:
+            return 0
+        return self.offsets.itemsize * len(self.offsets) + self.keys.itemsize * len(self.keys)
+
+    def save(self, path: str):
+        """保存索引到文件（小端序）"""
+        self._ensure_built()
+        offsets, keys = array('I', self.offsets), array('H', self.keys)
+        if sys.byteorder != 'little':
+            offsets.byteswap()
+            keys.byteswap()
+        with open(path, 'wb') as f:
+            f.write(self.MAGIC)
+            f.write(len(keys).to_bytes(4, 'little'))
+            offsets.tofile(f)
+            keys.tofile(f)
+
+    @classmethod
+    def load(cls, path: str) -> 'KnownPlaintextIndex':
+        """从文件加载索引"""
+        with open(path, 'rb') as f:
+            if f.read(len(cls.MAGIC)) != cls.MAGIC:
+                raise ValueError("不是有效的S-DES密钥索引文件")
+            key_count = int.from_bytes(f.read(4), 'little')
+            offsets, keys = array('I'), array('H')
+            offsets.fromfile(f, cls.SLOT_COUNT + 1)
+            keys.fromfile(f, key_count)
+        if sys.byteorder != 'little':
+            offsets.byteswap()
+            keys.byteswap()
+
+        index = cls()
+        index.offsets = offsets
+        index.keys = keys
+        return index
+
+
+def parse_pairs(text: str) -> List[Tuple[int, int]]:
+    """解析明密文对文本：每行一对8位二进制数（空白或逗号分隔），忽略空行和#注释"""
+    pairs = []
+    for line_number, line in enumerate(text.splitlines(), 1):
+        line = line.split('#', 1)[0].replace(',', ' ').strip()
+        if not line:
+            continue
+        fields = line.split()
+        if len(fields) != 2 or not all(len(f) == 8 and all(c in '01' for c in f) for f in fields):
+            raise ValueError(f"第{line_number}行格式错误，应为两个8位二进制数: {line}")
+        pairs.append((int(fields[0], 2), int(fields[1], 2)))
+    return pairs
+
+
+def main():
+    """命令行：python sdes_keyindex.py 明密文对文件"""
+    if len(sys.argv) != 2:
+        print("用法: python sdes_keyindex.py <明密文对文件>")
+        return 1
+
+    with open(sys.argv[1], encoding='utf-8') as f:
+        pairs = parse_pairs(f.read())
+
+    result = KnownPlaintextIndex().recover_keys(pairs)
+    print(f"使用明密文对: {result['pairs_used']}/{result['pairs_total']}")
+    print(f"候选数变化: {' -> '.join(map(str, result['history']))}")
+    print(f"候选密钥 ({len(result['keys'])}): {', '.join(result['keys'])}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,8 @@
 """
-启动S-DES图形用户界面
+S-DES主程序入口：无参数时启动图形用户界面，带参数时执行命令行子命令
 """
 
 import sys
-from sdes_gui import SDESGUI
 
 
 def check_dependencies():
@@ -36,8 +35,8 @@ def check_dependencies():
     return True
 
 
-def main():
-    """主函数"""
+def run_gui():
+    """启动图形界面（仅在此时导入tkinter）"""
     
     # 检查依赖项
     if not check_dependencies():
@@ -50,6 +49,7 @@ def main():
     print("请稍候...")
     
     try:
+        from sdes_gui import SDESGUI
         gui = SDESGUI()
         print("✅ GUI界面加载成功！")
         print("💡 提示：请在图形界面中进行操作")
@@ -60,5 +60,18 @@ def main():
         input("按回车键退出...")
 
 
+def main(argv=None):
+    """主函数"""
+    argv = sys.argv[1:] if argv is None else argv
+    
+    # 带参数时作为命令行工具运行，不加载图形界面
+    if argv:
+        from sdes_cli import main as cli_main
+        return cli_main(argv)
+    
+    run_gui()
+    return 0
+
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
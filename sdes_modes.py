@@ -0,0 +1,243 @@
+"""
+S-DES分组密码工作模式（ECB、CBC、CFB、OFB、CTR）
+
+分组长度为8位，每个字节即一个分组，因此所有模式都不需要填充。
+加密器/解密器对象支持分块调用 update()，最后调用 finalize()，适合任意长度的流式数据。
+"""
+
+import os
+from functools import lru_cache
+from typing import Optional, Union
+
+from sdes_algorithm import SDES, KeyLike
+
+
+MODES = ('ecb', 'cbc', 'cfb', 'ofb', 'ctr')
+
+# 密钥流周期缓存容量（按 (密钥代换表, IV) 缓存）
+KEYSTREAM_CACHE_SIZE = 4096
+
+# 未指定SDES实例时共用的默认实例（复用查找表与预处理密钥缓存，避免每个处理器重新生成）
+_default_sdes = SDES()
+
+
+def xor_bytes(a: bytes, b: bytes) -> bytes:
+    """等长字节序列按位异或（整体转换为大整数运算）"""
+    length = len(a)
+    return (int.from_bytes(a, 'little') ^ int.from_bytes(b, 'little')).to_bytes(length, 'little')
+
+
+@lru_cache(maxsize=KEYSTREAM_CACHE_SIZE)
+def _ofb_cycle(encrypt_table: bytes, iv: int) -> bytes:
+    """OFB密钥流的一个完整周期：S_1, S_2, ... 直到回到IV
+
+    代换表是0-255上的置换，从IV出发的轨道必然是纯循环，周期不超过256。
+    """
+    cycle = bytearray()
+    state = encrypt_table[iv]
+    cycle.append(state)
+    while state != iv:
+        state = encrypt_table[state]
+        cycle.append(state)
+    return bytes(cycle)
+
+
+@lru_cache(maxsize=KEYSTREAM_CACHE_SIZE)
+def _ctr_cycle(encrypt_table: bytes, nonce: int) -> bytes:
+    """CTR密钥流的一个完整周期：E(nonce), E(nonce+1), ...（8位计数器周期为256）"""
+    return encrypt_table[nonce:] + encrypt_table[:nonce]
+
+
+def repeat_cycle(cycle: bytes, offset: int, length: int) -> bytes:
+    """从周期内第offset个位置开始，循环取length个字节"""
+    offset %= len(cycle)
+    rotated = cycle[offset:] + cycle[:offset]
+    return (rotated * (length // len(rotated) + 1))[:length]
+
+
+def ofb_cycle(key: KeyLike, iv: int, sdes: Optional[SDES] = None) -> bytes:
+    """返回OFB模式在给定密钥和IV下的密钥流周期（已缓存）"""
+    sdes = sdes or _default_sdes
+    return _ofb_cycle(sdes.prepare_key(key).encrypt_table, _iv_value(iv, required=True))
+
+
+def keystream_cache_info():
+    """返回OFB/CTR密钥流周期缓存的命中统计"""
+    return {"ofb": _ofb_cycle.cache_info(), "ctr": _ctr_cycle.cache_info()}
+
+
+def _iv_value(iv: Union[int, bytes, None], required: bool) -> int:
+    """把IV/计数器初值统一转换为0-255整数，未给出时随机生成"""
+    if iv is None:
+        if required:
+            raise ValueError("解密时必须提供IV")
+        return os.urandom(1)[0]
+    if isinstance(iv, (bytes, bytearray)):
+        if len(iv) != 1:
+            raise ValueError("IV必须是1个字节")
+        return iv[0]
+    if not 0 <= iv < 256:
+        raise ValueError("IV必须是8位")
+    return iv
+
+
+class ModeCipher:
+    """工作模式基类：分块处理数据，处理器对象只能单向使用"""
+
+    mode = None
+    uses_iv = True
+
+    def __init__(self, key: KeyLike, iv: Union[int, bytes, None] = None,
+                 decrypt: bool = False, sdes: Optional[SDES] = None):
+        self.sdes = sdes or _default_sdes
+        prepared = self.sdes.prepare_key(key)
+        self.encrypt_table = prepared.encrypt_table
+        self.decrypt_table = prepared.decrypt_table
+        self.decrypting = decrypt
+        self.iv = _iv_value(iv, required=decrypt) if self.uses_iv else None
+        self.position = 0
+        self.finalized = False
+
+    def update(self, data) -> bytes:
+        """处理一段数据，返回等长的输出"""
+        if self.finalized:
+            raise ValueError("处理器已结束，不能继续调用update")
+        data = bytes(data)
+        if not data:
+            return b''
+        result = self._process(data)
+        self.position += len(data)
+        return result
+
+    def update_into(self, data, out) -> int:
+        """处理一段数据并写入调用方提供的可写缓冲区out，返回写入的字节数"""
+        # 先检查长度再更新，避免缓冲区不足时链接状态已经前进
+        out = memoryview(out).cast('B')
+        if len(out) < memoryview(data).nbytes:
+            raise ValueError("目标缓冲区长度不足")
+        result = self.update(data)
+        out[:len(result)] = result
+        return len(result)
+
+    def finalize(self) -> bytes:
+        """结束处理（8位分组无需填充，不会产生额外输出）"""
+        self.finalized = True
+        return b''
+
+    def _process(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+
+class ECBCipher(ModeCipher):
+    """ECB模式：每个字节独立代换"""
+
+    mode = 'ecb'
+    uses_iv = False
+
+    def _process(self, data: bytes) -> bytes:
+        return data.translate(self.decrypt_table if self.decrypting else self.encrypt_table)
+
+
+class CBCCipher(ModeCipher):
+    """CBC模式：C_i = E(P_i ^ C_{i-1})，解密可批量进行"""
+
+    mode = 'cbc'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.previous = self.iv
+
+    def _process(self, data: bytes) -> bytes:
+        if self.decrypting:
+            # P_i = D(C_i) ^ C_{i-1}：整段查表后与错位一个字节的密文异或
+            shifted = bytes((self.previous,)) + data[:-1]
+            self.previous = data[-1]
+            return xor_bytes(data.translate(self.decrypt_table), shifted)
+
+        encrypt_table = self.encrypt_table
+        previous = self.previous
+        output = bytearray(len(data))
+        for i, byte in enumerate(data):
+            previous = encrypt_table[byte ^ previous]
+            output[i] = previous
+        self.previous = previous
+        return bytes(output)
+
+
+class CFBCipher(ModeCipher):
+    """CFB模式（8位反馈）：C_i = P_i ^ E(C_{i-1})，解密可批量进行"""
+
+    mode = 'cfb'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.previous = self.iv
+
+    def _process(self, data: bytes) -> bytes:
+        if self.decrypting:
+            shifted = bytes((self.previous,)) + data[:-1]
+            self.previous = data[-1]
+            return xor_bytes(data, shifted.translate(self.encrypt_table))
+
+        encrypt_table = self.encrypt_table
+        previous = self.previous
+        output = bytearray(len(data))
+        for i, byte in enumerate(data):
+            previous = byte ^ encrypt_table[previous]
+            output[i] = previous
+        self.previous = previous
+        return bytes(output)
+
+
+class OFBCipher(ModeCipher):
+    """OFB模式：S_i = E(S_{i-1})，C_i = P_i ^ S_i（加解密相同，密钥流由缓存的周期重复得到）"""
+
+    mode = 'ofb'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cycle = _ofb_cycle(self.encrypt_table, self.iv)
+
+    def _process(self, data: bytes) -> bytes:
+        return xor_bytes(data, repeat_cycle(self.cycle, self.position, len(data)))
+
+
+class CTRCipher(ModeCipher):
+    """CTR模式：C_i = P_i ^ E((nonce + i) mod 256)（加解密相同，密钥流由缓存的周期重复得到）"""
+
+    mode = 'ctr'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cycle = _ctr_cycle(self.encrypt_table, self.iv)
+
+    def _process(self, data: bytes) -> bytes:
+        return xor_bytes(data, repeat_cycle(self.cycle, self.position, len(data)))
+
+
+_MODE_CLASSES = {
+    'ecb': ECBCipher,
+    'cbc': CBCCipher,
+    'cfb': CFBCipher,
+    'ofb': OFBCipher,
+    'ctr': CTRCipher
+}
+
+
+def _mode_class(mode: str):
+    try:
+        return _MODE_CLASSES[mode.lower()]
+    except KeyError:
+        raise ValueError(f"不支持的工作模式: {mode}（可选: {', '.join(MODES)}）")
+
+
+def new_encryptor(mode: str, key: KeyLike, iv: Union[int, bytes, None] = None,
+                  sdes: Optional[SDES] = None) -> ModeCipher:
+    """创建加密器；未给出IV时随机生成，可从返回对象的iv属性读取"""
+    return _mode_class(mode)(key, iv, decrypt=False, sdes=sdes)
+
+
+def new_decryptor(mode: str, key: KeyLike, iv: Union[int, bytes, None] = None,
+                  sdes: Optional[SDES] = None) -> ModeCipher:
+    """创建解密器（除ECB外必须提供加密时使用的IV）"""
+    return _mode_class(mode)(key, iv, decrypt=True, sdes=sdes)
@@ -0,0 +1,196 @@
+"""
+S-DES统计质量分析：雪崩效应、比特偏差与输出分布卡方检验（NumPy向量化），并生成PNG图表
+"""
+
+import math
+import os
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from sdes_codebook import CodebookEngine
+
+
+# 8位整数中1的个数
+POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+# 第1位为最高位（与字符串表示一致）
+BLOCK_BITS = 8
+KEY_BITS = 10
+
+
+def codebook_array(codebook: Optional[CodebookEngine] = None) -> np.ndarray:
+    """完整码本的 (1024, 256) uint8 数组：table[密钥, 明文] = 密文"""
+    codebook = CodebookEngine.full() if codebook is None else codebook.build_all()
+    return np.frombuffer(bytes(codebook.encrypt_table), dtype=np.uint8).reshape(
+        CodebookEngine.KEY_COUNT, CodebookEngine.BLOCK_COUNT)
+
+
+def _bits(values: np.ndarray) -> np.ndarray:
+    """把uint8数组展开为最后一维的8个比特（第1位在前）"""
+    return (values[..., None] >> np.arange(BLOCK_BITS - 1, -1, -1, dtype=np.uint8)) & 1
+
+
+def _flip_statistics(table: np.ndarray, flipped: np.ndarray) -> tuple:
+    """对比原密文与翻转一位后的密文：各输出位翻转概率 (8,) 与汉明距离计数 (9,)"""
+    difference = table ^ flipped
+    probabilities = _bits(difference).mean(axis=(0, 1))
+    distances = np.bincount(POPCOUNT[difference].ravel(), minlength=BLOCK_BITS + 1)
+    return probabilities, distances
+
+
+def plaintext_avalanche(table: np.ndarray) -> dict:
+    """明文雪崩：翻转明文第i位时密文第j位翻转的概率矩阵 (8 × 8) 与汉明距离分布"""
+    blocks = np.arange(CodebookEngine.BLOCK_COUNT)
+    matrix, distances = [], []
+    for bit in range(BLOCK_BITS):
+        flipped = table[:, blocks ^ (1 << (BLOCK_BITS - 1 - bit))]
+        probabilities, histogram = _flip_statistics(table, flipped)
+        matrix.append(probabilities)
+        distances.append(histogram)
+    return {"matrix": np.array(matrix), "distances": np.array(distances)}
+
+
+def key_avalanche(table: np.ndarray) -> dict:
+    """密钥雪崩：翻转密钥第i位时密文第j位翻转的概率矩阵 (10 × 8) 与汉明距离分布"""
+    keys = np.arange(CodebookEngine.KEY_COUNT)
+    matrix, distances = [], []
+    for bit in range(KEY_BITS):
+        flipped = table[keys ^ (1 << (KEY_BITS - 1 - bit)), :]
+        probabilities, histogram = _flip_statistics(table, flipped)
+        matrix.append(probabilities)
+        distances.append(histogram)
+    return {"matrix": np.array(matrix), "distances": np.array(distances)}
+
+
+def bit_bias(table: np.ndarray) -> dict:
+    """比特偏差：P(密文第j位 = 明文第i位) - 1/2，整体 (8 × 8) 与各密钥的最大绝对偏差"""
+    inputs = _bits(np.arange(CodebookEngine.BLOCK_COUNT, dtype=np.uint8))
+    outputs = _bits(table)
+    # 各密钥下：agree[key, i, j] = 明文第i位与密文第j位相同的比例
+    agree = np.einsum('bi,kbj->kij', inputs, outputs) + np.einsum('bi,kbj->kij', 1 - inputs, 1 - outputs)
+    per_key = agree / CodebookEngine.BLOCK_COUNT - 0.5
+    return {"matrix": per_key.mean(axis=0), "per_key_max": np.abs(per_key).max(axis=(1, 2))}
+
+
+def output_chi_square(table: np.ndarray) -> dict:
+    """固定明文时全部密钥产生的密文分布与均匀分布的卡方统计量（每个明文一个，自由度255）"""
+    key_count, block_count = table.shape
+    counts = np.bincount((np.arange(block_count) * block_count + table).ravel(),
+                         minlength=block_count * block_count).reshape(block_count, block_count)
+    expected = key_count / block_count
+    statistics = ((counts - expected) ** 2 / expected).sum(axis=1)
+    return {"statistics": statistics, "dof": block_count - 1}
+
+
+def quality_report(codebook: Optional[CodebookEngine] = None) -> dict:
+    """完整统计质量分析（结果为可直接写入JSON的列表与数值）"""
+    start_time = time.perf_counter()
+    table = codebook_array(codebook)
+    plaintext = plaintext_avalanche(table)
+    key = key_avalanche(table)
+    bias = bit_bias(table)
+    chi_square = output_chi_square(table)
+    elapsed = time.perf_counter() - start_time
+
+    dof = chi_square["dof"]
+    statistics = chi_square["statistics"]
+    return {
+        "evaluations": {
+            "plaintext_flips": int(table.size * BLOCK_BITS),
+            "key_flips": int(table.size * KEY_BITS)
+        },
+        "plaintext_avalanche": {
+            "matrix": plaintext["matrix"].round(6).tolist(),
+            "mean_flipped_bits": float(plaintext["matrix"].sum(axis=1).mean()),
+            "distance_histogram": plaintext["distances"].sum(axis=0).tolist()
+        },
+        "key_avalanche": {
+            "matrix": key["matrix"].round(6).tolist(),
+            "mean_flipped_bits": float(key["matrix"].sum(axis=1).mean()),
+            "distance_histogram": key["distances"].sum(axis=0).tolist()
+        },
+        "bit_bias": {
+            "matrix": bias["matrix"].round(6).tolist(),
+            "max_abs": float(np.abs(bias["matrix"]).max()),
+            "per_key_max_abs_mean": float(bias["per_key_max"].mean()),
+            "per_key_max_abs_max": float(bias["per_key_max"].max())
+        },
+        "output_chi_square": {
+            "dof": dof,
+            "mean": float(statistics.mean()),
+            "min": float(statistics.min()),
+            "max": float(statistics.max()),
+            # 卡方分布标准差为 sqrt(2·dof)，偏离超过3倍视为异常
+            "outliers": int((np.abs(statistics - dof) > 3 * np.sqrt(2 * dof)).sum()),
+            "statistics": statistics.round(3).tolist()
+        },
+        "time": elapsed
+    }
+
+
+def render_charts(report: dict, directory: str) -> List[str]:
+    """把报告绘制为PNG图表（热力图与直方图），返回生成的文件路径"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+
+    def save(figure, name):
+        path = os.path.join(directory, name)
+        figure.tight_layout()
+        figure.savefig(path, dpi=120)
+        plt.close(figure)
+        paths.append(path)
+
+    def heatmap(matrix, title, ylabel, name, center=0.5, span=0.5):
+        matrix = np.array(matrix)
+        figure, axes = plt.subplots(figsize=(6, 0.45 * len(matrix) + 1.5))
+        image = axes.imshow(matrix, cmap='coolwarm', vmin=center - span, vmax=center + span)
+        for (row, column), value in np.ndenumerate(matrix):
+            axes.text(column, row, f"{value:.2f}", ha='center', va='center', fontsize=7)
+        axes.set_xticks(range(matrix.shape[1]), [str(i + 1) for i in range(matrix.shape[1])])
+        axes.set_yticks(range(matrix.shape[0]), [str(i + 1) for i in range(matrix.shape[0])])
+        axes.set_xlabel("ciphertext bit")
+        axes.set_ylabel(ylabel)
+        axes.set_title(title)
+        figure.colorbar(image, ax=axes)
+        save(figure, name)
+
+    heatmap(report["plaintext_avalanche"]["matrix"], "Plaintext avalanche: P(output bit flips)",
+            "flipped plaintext bit", "avalanche_plaintext.png")
+    heatmap(report["key_avalanche"]["matrix"], "Key avalanche: P(output bit flips)",
+            "flipped key bit", "avalanche_key.png")
+    heatmap(report["bit_bias"]["matrix"], "Bit bias: P(out_j = in_i) - 1/2",
+            "plaintext bit", "bit_bias.png", center=0.0, span=0.25)
+
+    # 汉明距离分布与理想二项分布 B(8, 1/2) 对比
+    figure, axes = plt.subplots(figsize=(7, 4))
+    distances = np.arange(BLOCK_BITS + 1)
+    binomial = np.array([math.comb(BLOCK_BITS, d) for d in distances]) / 2 ** BLOCK_BITS
+    for offset, (label, name) in zip((-0.2, 0.2), (("plaintext flip", "plaintext_avalanche"),
+                                                   ("key flip", "key_avalanche"))):
+        histogram = np.array(report[name]["distance_histogram"], dtype=float)
+        axes.bar(distances + offset, histogram / histogram.sum(), width=0.4, label=label)
+    axes.plot(distances, binomial, 'k.--', label="ideal B(8, 1/2)")
+    axes.set_xlabel("Hamming distance between ciphertexts")
+    axes.set_ylabel("fraction")
+    axes.set_title("Avalanche distance distribution")
+    axes.legend()
+    save(figure, "avalanche_distance.png")
+
+    # 各明文的卡方统计量分布
+    chi_square = report["output_chi_square"]
+    figure, axes = plt.subplots(figsize=(7, 4))
+    axes.hist(chi_square["statistics"], bins=32, color='#3498db')
+    axes.axvline(chi_square["dof"], color='k', linestyle='--', label=f"dof = {chi_square['dof']}")
+    axes.set_xlabel("chi-square of ciphertext distribution over keys (per plaintext)")
+    axes.set_ylabel("plaintexts")
+    axes.set_title("Output distribution chi-square")
+    axes.legend()
+    save(figure, "chi_square.png")
+
+    return paths
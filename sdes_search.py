@@ -0,0 +1,263 @@
+"""
+三重S-DES（EDE）并行可恢复密钥搜索
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from sdes_codebook import CodebookEngine
+
+
+CHECKPOINT_VERSION = 1
+
+# 工作进程内的码本（由进程初始化函数创建）
+_worker_codebook = None
+
+
+def _init_worker(table_cache: Optional[str] = None, shared_name: Optional[str] = None):
+    """工作进程初始化：挂接主进程发布的共享码本；否则从缓存文件mmap加载或自行生成"""
+    global _worker_codebook
+    if shared_name:
+        from sdes_shared import attach_codebook
+        _worker_codebook = attach_codebook(shared_name)
+        return
+    if table_cache:
+        from sdes_tablecache import load_codebook
+        _worker_codebook = load_codebook(table_cache)
+        return
+    _worker_codebook = CodebookEngine.full()
+
+
+def search_shard(codebook: CodebookEngine, k1_start: int, k1_stop: int,
+                 pairs: Sequence[Tuple[int, int]], three_keys: bool) -> Tuple[List[int], int]:
+    """搜索第一重密钥位于 [k1_start, k1_stop) 的分片，返回匹配的组合密钥和检查的密钥数
+
+    E-D-E三段中，最后一段用"中间值 -> 满足 E_k3(中间值) = 密文 的k3列表"表直接连接，
+    不必再枚举k3。
+    """
+    encrypt_table, decrypt_table = codebook.encrypt_table, codebook.decrypt_table
+    key_count = CodebookEngine.KEY_COUNT
+    plaintext, ciphertext = pairs[0]
+    rest = pairs[1:]
+
+    last_stage = None
+    if three_keys:
+        last_stage = [[] for _ in range(256)]
+        for k3 in range(key_count):
+            last_stage[decrypt_table[(k3 << 8) | ciphertext]].append(k3)
+
+    def matches_rest(k1, k2, k3):
+        for p, c in rest:
+            middle = decrypt_table[(k2 << 8) | encrypt_table[(k1 << 8) | p]]
+            if encrypt_table[(k3 << 8) | middle] != c:
+                return False
+        return True
+
+    found = []
+    for k1 in range(k1_start, k1_stop):
+        first = encrypt_table[(k1 << 8) | plaintext]
+        k3_base = k1 << 8
+        for k2 in range(key_count):
+            middle = decrypt_table[(k2 << 8) | first]
+            if three_keys:
+                for k3 in last_stage[middle]:
+                    if matches_rest(k1, k2, k3):
+                        found.append((((k1 << 10) | k2) << 10) | k3)
+            elif encrypt_table[k3_base | middle] == ciphertext and matches_rest(k1, k2, k1):
+                found.append((k1 << 10) | k2)
+
+    checked = (k1_stop - k1_start) * key_count * (key_count if three_keys else 1)
+    return found, checked
+
+
+def _run_shard(task):
+    """进程池任务入口"""
+    shard, k1_start, k1_stop, pairs, three_keys = task
+    found, checked = search_shard(_worker_codebook, k1_start, k1_stop, pairs, three_keys)
+    return shard, found, checked
+
+
+class TripleKeySearch:
+    """三重S-DES密钥搜索：按第一重密钥分片、多进程并行、定期写检查点以便中断后恢复"""
+
+    def __init__(self, pairs: Sequence[Tuple[int, int]], three_keys: bool = False,
+                 workers: Optional[int] = None, shard_size: int = 16,
+                 checkpoint_path: Optional[str] = None, checkpoint_interval: float = 5.0,
+                 table_cache: Optional[str] = None):
+        if not pairs:
+            raise ValueError("至少需要一组明密文对")
+        self.pairs = [tuple(pair) for pair in pairs]
+        self.three_keys = three_keys
+        self.workers = workers or os.cpu_count() or 1
+        self.shard_size = shard_size
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self.table_cache = table_cache
+
+        self.shards = [
+            (start, min(start + shard_size, CodebookEngine.KEY_COUNT))
+            for start in range(0, CodebookEngine.KEY_COUNT, shard_size)
+        ]
+        self.completed = set()
+        self.found = []
+        self.checked = 0
+
+    @property
+    def key_bits(self) -> int:
+        """组合密钥位数"""
+        return 30 if self.three_keys else 20
+
+    @property
+    def total_keys(self) -> int:
+        """密钥空间大小"""
+        return 1 << self.key_bits
+
+    def _checkpoint_state(self) -> dict:
+        return {
+            "version": CHECKPOINT_VERSION,
+            "pairs": [list(pair) for pair in self.pairs],
+            "three_keys": self.three_keys,
+            "shard_size": self.shard_size,
+            "completed": sorted(self.completed),
+            "found": sorted(self.found),
+            "checked": self.checked
+        }
+
+    def save_checkpoint(self):
+        """写入检查点（先写临时文件再替换，避免中断时损坏）"""
+        if not self.checkpoint_path:
+            return
+        temp_path = self.checkpoint_path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._checkpoint_state(), f)
+        os.replace(temp_path, self.checkpoint_path)
+
+    def load_checkpoint(self) -> bool:
+        """从检查点恢复进度（参数不一致时忽略），返回是否成功恢复"""
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return False
+        with open(self.checkpoint_path, encoding='utf-8') as f:
+            state = json.load(f)
+
+        current = self._checkpoint_state()
+        if any(state.get(name) != current[name] for name in ("version", "pairs", "three_keys", "shard_size")):
+            return False
+
+        self.completed = set(state["completed"])
+        self.found = list(state["found"])
+        self.checked = state["checked"]
+        return True
+
+    def _record(self, shard: int, found: List[int], checked: int):
+        self.completed.add(shard)
+        self.found.extend(found)
+        self.checked += checked
+
+    def run(self, progress: Optional[Callable[[int, int, float], None]] = None,
+            progress_interval: float = 1.0) -> dict:
+        """执行搜索；progress(已检查密钥数, 总密钥数, 当前吞吐量 密钥/秒) 按时间间隔回调"""
+        resumed = self.load_checkpoint()
+        pending = [
+            (shard, start, stop, self.pairs, self.three_keys)
+            for shard, (start, stop) in enumerate(self.shards)
+            if shard not in self.completed
+        ]
+
+        start_time = time.perf_counter()
+        checked_at_start = self.checked
+        last_report = last_checkpoint = start_time
+
+        def after_shard():
+            nonlocal last_report, last_checkpoint
+            now = time.perf_counter()
+            if now - last_checkpoint >= self.checkpoint_interval:
+                self.save_checkpoint()
+                last_checkpoint = now
+            if progress is not None and now - last_report >= progress_interval:
+                rate = (self.checked - checked_at_start) / max(now - start_time, 1e-9)
+                progress(self.checked, self.total_keys, rate)
+                last_report = now
+
+        if self.table_cache:
+            from sdes_tablecache import load_codebook
+            codebook = load_codebook(self.table_cache)
+        else:
+            codebook = None
+
+        if self.workers <= 1:
+            # 单进程直接使用本次搜索的码本，模块级码本只供进程池工作进程使用
+            codebook = CodebookEngine.full() if codebook is None else codebook
+            for shard, k1_start, k1_stop, pairs, three_keys in pending:
+                self._record(shard, *search_shard(codebook, k1_start, k1_stop, pairs, three_keys))
+                after_shard()
+        else:
+            from sdes_shared import SharedCodebook
+            # 主进程只构建/加载一次码本并发布到共享内存，各工作进程按名称挂接
+            with SharedCodebook(codebook) as shared:
+                with multiprocessing.Pool(self.workers, initializer=_init_worker,
+                                          initargs=(None, shared.name)) as pool:
+                    for result in pool.imap_unordered(_run_shard, pending):
+                        self._record(*result)
+                        after_shard()
+
+        self.save_checkpoint()
+        elapsed = time.perf_counter() - start_time
+        rate = (self.checked - checked_at_start) / max(elapsed, 1e-9)
+        if progress is not None:
+            progress(self.checked, self.total_keys, rate)
+
+        width = 10
+        keys = []
+        for key in sorted(self.found):
+            parts = [(key >> (width * i)) & 0x3FF for i in reversed(range(self.key_bits // width))]
+            keys.append(' '.join(format(part, '010b') for part in parts))
+        return {
+            "keys": keys,
+            "checked": self.checked,
+            "total": self.total_keys,
+            "resumed": resumed,
+            "time": elapsed,
+            "keys_per_sec": rate
+        }
+
+
+def _load_pairs(path: str) -> List[Tuple[int, int]]:
+    from sdes_keyindex import parse_pairs
+    with open(path, encoding='utf-8') as f:
+        return parse_pairs(f.read())
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="三重S-DES（EDE）并行密钥搜索")
+    parser.add_argument("pairs", help="明密文对文件（每行: 明文 密文）")
+    parser.add_argument("--three-keys", action="store_true", help="三密钥模式（默认双密钥 k3 = k1）")
+    parser.add_argument("--workers", type=int, default=None, help="工作进程数（默认CPU核数）")
+    parser.add_argument("--shard-size", type=int, default=16, help="每个分片包含的第一重密钥数")
+    parser.add_argument("--checkpoint", default=None, help="检查点文件路径（中断后重新运行即可恢复）")
+    parser.add_argument("--table-cache", default=None, help="码本缓存文件（mmap加载，不存在时自动生成）")
+    args = parser.parse_args(argv)
+
+    search = TripleKeySearch(_load_pairs(args.pairs), three_keys=args.three_keys, workers=args.workers,
+                             shard_size=args.shard_size, checkpoint_path=args.checkpoint,
+                             table_cache=args.table_cache)
+
+    def report(checked, total, rate):
+        print(f"进度: {checked / total * 100:.1f}% ({checked}/{total}), {rate:.0f} 密钥/秒", flush=True)
+
+    result = search.run(progress=report)
+    if result["resumed"]:
+        print("已从检查点恢复")
+    print(f"用时: {result['time']:.2f}秒, 找到 {len(result['keys'])} 个候选密钥")
+    for key in result["keys"]:
+        print(key)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+S-DES码本共享内存：主进程发布一次，进程池工作进程按名称零拷贝挂接
+"""
+
+import atexit
+import multiprocessing
+import sys
+import time
+from multiprocessing import shared_memory
+from typing import Optional
+
+from sdes_algorithm import SDES
+from sdes_codebook import CodebookEngine
+
+
+CODEBOOK_SIZE = CodebookEngine.KEY_COUNT * CodebookEngine.BLOCK_COUNT
+
+# 本进程已挂接的共享内存及导出的码本视图（保持引用，退出时先释放视图再关闭）
+_attached = {}
+
+
+class SharedCodebook:
+    """发布到共享内存的完整码本（加密表在前、解密表在后），由创建者负责释放"""
+
+    def __init__(self, codebook: Optional[CodebookEngine] = None):
+        codebook = CodebookEngine.full() if codebook is None else codebook.build_all()
+
+        self.shm = shared_memory.SharedMemory(create=True, size=2 * CODEBOOK_SIZE)
+        self.shm.buf[:CODEBOOK_SIZE] = codebook.encrypt_table
+        self.shm.buf[CODEBOOK_SIZE:2 * CODEBOOK_SIZE] = codebook.decrypt_table
+        self.closed = False
+
+    @property
+    def name(self) -> str:
+        """共享内存名称（传给工作进程用于挂接）"""
+        return self.shm.name
+
+    def close(self):
+        """关闭并删除共享内存段（可重复调用）"""
+        if self.closed:
+            return
+        self.closed = True
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self) -> 'SharedCodebook':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def attach_codebook(name: str, sdes: Optional[SDES] = None) -> CodebookEngine:
+    """按名称挂接共享码本，返回直接引用共享内存的码本引擎（不复制数据）"""
+    if name not in _attached:
+        shm = shared_memory.SharedMemory(name=name)
+        views = (shm.buf[:CODEBOOK_SIZE], shm.buf[CODEBOOK_SIZE:2 * CODEBOOK_SIZE])
+        _attached[name] = (shm, views)
+    views = _attached[name][1]
+
+    codebook = CodebookEngine(sdes, lazy_rows=False)
+    codebook.attach_tables(*views)
+    return codebook
+
+
+def detach(name: str):
+    """断开挂接（之后该共享码本的引擎不可再使用）；删除由创建者负责"""
+    shm, views = _attached.pop(name)
+    for view in views:
+        view.release()
+    shm.close()
+
+
+@atexit.register
+def _detach_all():
+    for name in list(_attached):
+        detach(name)
+
+
+def _measure_worker(args) -> dict:
+    """工作进程：测量获取码本的时间与常驻内存"""
+    name, = args
+    start_time = time.perf_counter()
+    if name:
+        codebook = attach_codebook(name)
+    else:
+        codebook = CodebookEngine.full()
+    codebook.encrypt_int(0b10111101, 0b1010000010)
+    elapsed = time.perf_counter() - start_time
+
+    rss = None
+    if sys.platform != 'win32':
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {"time": elapsed, "max_rss_kib": rss}
+
+
+def benchmark_worker_startup(workers: int = 4) -> dict:
+    """比较工作进程各自构建码本与挂接共享码本的启动时间"""
+    results = {}
+    with SharedCodebook() as shared:
+        for label, name in (("build", None), ("shared", shared.name)):
+            # 每个任务在新进程中执行，测到的是首次获取码本的开销
+            with multiprocessing.Pool(workers, maxtasksperchild=1) as pool:
+                measurements = pool.map(_measure_worker, [(name,)] * workers)
+            results[label] = {
+                "mean_time": sum(m["time"] for m in measurements) / workers,
+                "max_rss_kib": max(m["max_rss_kib"] or 0 for m in measurements)
+            }
+    return results
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    for label, result in benchmark_worker_startup(count).items():
+        print(f"{label:>6}: 平均获取码本 {result['mean_time'] * 1000:.2f} ms, "
+              f"最大常驻内存 {result['max_rss_kib']} KiB ({count} 个工作进程)")
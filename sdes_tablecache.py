@@ -0,0 +1,163 @@
+"""
+S-DES派生表磁盘缓存：码本与已知明文索引写入带版本号的二进制文件，后续进程以mmap加载
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from typing import Optional
+
+from sdes_algorithm import SDES
+from sdes_codebook import CodebookEngine
+from sdes_keyindex import KnownPlaintextIndex
+
+
+MAGIC = b'SDTABLES'
+FORMAT_VERSION = 1
+
+# 文件头: 魔数, 格式版本, SDES参数摘要, 索引密钥数；补齐到64字节使各数据段对齐
+HEADER = struct.Struct('<8sI32sI')
+HEADER_SIZE = 64
+
+# 参与摘要的派生查找表：码本由这些表计算，摘要与缓存内容必然对应（任一改变都会使缓存失效）
+TABLE_NAMES = ('ip_table', 'ip_inv_table', 'ep_table', 'f_table', 'p10_table', 'p8_table',
+               'shift1_table', 'shift2_table')
+
+CODEBOOK_SIZE = CodebookEngine.KEY_COUNT * CodebookEngine.BLOCK_COUNT
+OFFSETS_SIZE = (KnownPlaintextIndex.SLOT_COUNT + 1) * 4
+
+
+def parameter_hash(sdes: Optional[SDES] = None) -> bytes:
+    """SDES派生查找表（加解密实际使用的置换表与轮函数表）的SHA-256摘要"""
+    sdes = sdes or SDES()
+    tables = {name: getattr(sdes, name) for name in TABLE_NAMES}
+    return hashlib.sha256(json.dumps(tables, sort_keys=True).encode('ascii')).digest()
+
+
+def default_cache_path() -> str:
+    """默认缓存文件路径（目录可由环境变量 SDES_CACHE_DIR 指定）"""
+    directory = os.environ.get('SDES_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.cache', 'sdes')
+    return os.path.join(directory, 'tables.bin')
+
+
+def write_cache(path: str, sdes: Optional[SDES] = None) -> int:
+    """计算完整码本与已知明文索引并写入缓存文件（先写临时文件再替换），返回文件大小"""
+    sdes = sdes or SDES()
+    codebook = CodebookEngine.full(sdes)
+    index = KnownPlaintextIndex(codebook).build()
+
+    offsets, keys = array('I', index.offsets), array('H', index.keys)
+    if sys.byteorder != 'little':
+        offsets.byteswap()
+        keys.byteswap()
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # 临时文件名带进程号，多个进程同时重建时互不干扰
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, parameter_hash(sdes), len(keys)).ljust(HEADER_SIZE, b'\0'))
+        f.write(codebook.encrypt_table)
+        f.write(codebook.decrypt_table)
+        offsets.tofile(f)
+        keys.tofile(f)
+        size = f.tell()
+    os.replace(temp_path, path)
+    return size
+
+
+def _map_valid(path: str, expected_hash: bytes) -> Optional[mmap.mmap]:
+    """只读映射缓存文件；文件不存在或魔数、版本、参数摘要、大小不符时返回None"""
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return None
+    with f:
+        size = os.fstat(f.fileno()).st_size
+        if size < HEADER_SIZE:
+            return None
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, digest, key_count = HEADER.unpack_from(mapped)
+    expected_size = HEADER_SIZE + 2 * CODEBOOK_SIZE + OFFSETS_SIZE + 2 * key_count
+    if magic != MAGIC or version != FORMAT_VERSION or digest != expected_hash or size != expected_size:
+        mapped.close()
+        return None
+    return mapped
+
+
+class TableCache:
+    """mmap加载的派生表缓存：codebook与index直接引用映射内存，多个进程共享同一份页缓存"""
+
+    def __init__(self, path: Optional[str] = None, sdes: Optional[SDES] = None):
+        self.path = path or default_cache_path()
+        self.sdes = sdes or SDES()
+        self.rebuilt = False
+
+        start_time = time.perf_counter()
+        digest = parameter_hash(self.sdes)
+        mapped = _map_valid(self.path, digest)
+        if mapped is None:
+            # 缓存缺失、格式过期或SDES参数已改变：重新计算并写回
+            write_cache(self.path, self.sdes)
+            self.rebuilt = True
+            mapped = _map_valid(self.path, digest)
+            if mapped is None:
+                raise ValueError(f"无法加载派生表缓存: {self.path}")
+        self.mapped = mapped
+        self._attach()
+        self.load_time = time.perf_counter() - start_time
+
+    def _attach(self):
+        """将映射内存按数据段划分给码本引擎与索引"""
+        view = memoryview(self.mapped)
+        encrypt_start = HEADER_SIZE
+        decrypt_start = encrypt_start + CODEBOOK_SIZE
+        offsets_start = decrypt_start + CODEBOOK_SIZE
+        keys_start = offsets_start + OFFSETS_SIZE
+
+        self.codebook = CodebookEngine(self.sdes, lazy_rows=False)
+        self.codebook.attach_tables(view[encrypt_start:decrypt_start], view[decrypt_start:offsets_start])
+
+        self.index = KnownPlaintextIndex(self.codebook)
+        if sys.byteorder == 'little':
+            self.index.offsets = view[offsets_start:keys_start].cast('I')
+            self.index.keys = view[keys_start:].cast('H')
+        else:
+            offsets, keys = array('I', view[offsets_start:keys_start]), array('H', view[keys_start:])
+            offsets.byteswap()
+            keys.byteswap()
+            self.index.offsets = offsets
+            self.index.keys = keys
+
+    def stats(self) -> dict:
+        """缓存加载统计信息"""
+        return {
+            "path": self.path,
+            "rebuilt": self.rebuilt,
+            "load_time": self.load_time,
+            "file_bytes": len(self.mapped)
+        }
+
+
+def load_codebook(path: Optional[str] = None, sdes: Optional[SDES] = None) -> CodebookEngine:
+    """从缓存加载完整码本引擎（需要时自动重建缓存）"""
+    return TableCache(path, sdes).codebook
+
+
+def load_index(path: Optional[str] = None, sdes: Optional[SDES] = None) -> KnownPlaintextIndex:
+    """从缓存加载已知明文索引（需要时自动重建缓存）"""
+    return TableCache(path, sdes).index
+
+
+if __name__ == "__main__":
+    cache = TableCache(sys.argv[1] if len(sys.argv) > 1 else None)
+    stats = cache.stats()
+    print(f"{'已重建' if stats['rebuilt'] else '已加载'} {stats['path']}: "
+          f"{stats['file_bytes'] // 1024} KiB, 用时 {stats['load_time'] * 1000:.1f} ms")
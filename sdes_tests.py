@@ -2,9 +2,25 @@
 S-DES算法测试
 """
 
+import io
+import json
+import os
+import random
+import tempfile
 import time
-import itertools
 from sdes_algorithm import SDES
+from sdes_analysis import collision_report, cycle_decomposition, permutation_summary
+from sdes_attacks import (byte_histogram, ciphertext_only_attack, crib_search, exhaustive_double_search,
+                          meet_in_the_middle)
+from sdes_bitslice import BitslicedSDES
+from sdes_codebook import CodebookEngine
+from sdes_fileio import (PARALLEL_ENCRYPT_MODES, decrypt_file, decrypt_file_inplace, encrypt_file,
+                         encrypt_file_inplace)
+from sdes_keyindex import KnownPlaintextIndex
+from sdes_modes import MODES, new_encryptor, new_decryptor, ofb_cycle
+from sdes_search import TripleKeySearch, search_shard
+from sdes_shared import SharedCodebook, attach_codebook, detach
+from sdes_tablecache import TableCache
 
 
 class SDESTester:
@@ -205,19 +221,18 @@ class SDESTester:
         total_keys = 1024
         checked_keys = 0
         
+        def on_progress(checked, total):
+            nonlocal checked_keys
+            checked_keys = checked
+        
         try:
-            for key_bits in itertools.product([0, 1], repeat=10):
-                checked_keys += 1
-                key = ''.join(map(str, key_bits))
-                
-                encrypted = self.sdes.encrypt_block(plaintext, key)
-                if encrypted == ciphertext:
-                    found_keys.append(key)
-                    if len(found_keys) <= 5:  # 只显示前5个
-                        print(f"🔍 找到密钥: {key}")
+            for key in self.sdes.search_keys(plaintext, ciphertext, progress=on_progress):
+                found_keys.append(key)
+                if len(found_keys) <= 5:  # 只显示前5个
+                    print(f"🔍 找到密钥: {key}")
             
             end_time = time.time()
-            elapsed_time = end_time - start_time
+            elapsed_time = max(end_time - start_time, 1e-9)
             
             print(f"\n⏱️  破解统计:")
             print(f"总用时: {elapsed_time:.4f}秒")
@@ -225,6 +240,22 @@ class SDESTester:
             print(f"找到密钥数: {len(found_keys)}")
             print(f"破解速度: {checked_keys/elapsed_time:.0f} 密钥/秒")
             
+            # 与逐个密钥调用encrypt_block的标量结果对照
+            scalar_start = time.perf_counter()
+            scalar_keys = [
+                format(k, '010b') for k in range(total_keys)
+                if self.sdes.encrypt_block(plaintext, format(k, '010b')) == ciphertext
+            ]
+            scalar_time = time.perf_counter() - scalar_start
+            search_ok = scalar_keys == found_keys
+            print(f"\n⚡ 标量对照: {scalar_time:.4f}秒 (搜索API加速 {scalar_time/elapsed_time:.1f}x) "
+                  f"{'✅ 结果一致' if search_ok else '❌ 结果不一致'}")
+            
+            # 仅查找第一个密钥
+            first_key = next(self.sdes.search_keys(plaintext, ciphertext, first_only=True), None)
+            first_ok = first_key == (found_keys[0] if found_keys else None)
+            print(f"首个匹配模式: {first_key} {'✅' if first_ok else '❌'}")
+            
             # 验证结果
             correct_key_found = test_key in found_keys
             status = "✅ 成功" if correct_key_found else "❌ 失败"
@@ -241,7 +272,7 @@ class SDESTester:
             performance_status = "✅ 优秀" if elapsed_time < 1.0 else "⚠️ 一般" if elapsed_time < 2.0 else "❌ 较慢"
             print(f"\n📈 性能评估: {performance_status}")
             
-            success = correct_key_found and performance_ok
+            success = correct_key_found and performance_ok and search_ok and first_ok
             print(f"\n📊 第4关测试结果: {'✅ 通过' if success else '❌ 失败'}")
             
             self.test_results.append(("第4关：暴力破解", success))
@@ -352,7 +383,23 @@ class SDESTester:
         if passed == len(test_keys):
             security_score += 1
         
-        total_tests = 3
+        # 全密钥空间：逐组核对报告中的等价密钥确实得到相同码本
+        print(f"\n🔍 全密钥空间码本碰撞分析:")
+        start_time = time.perf_counter()
+        report = collision_report(CodebookEngine(self.sdes, lazy_rows=False))
+        elapsed = time.perf_counter() - start_time
+        groups = [[int(key, 2) for key in group["keys"]] for group in report["equivalent_key_groups"]]
+        groups_ok = all(
+            self.sdes.prepare_key(key).encrypt_table == self.sdes.prepare_key(group[0]).encrypt_table
+            for group in groups for key in group
+        ) and report["distinct_codebooks"] + sum(len(group) - 1 for group in groups) == report["keys"]
+        print(f"不同码本: {report['distinct_codebooks']}/{report['keys']}, 等价密钥组: {len(groups)}, "
+              f"单个明文下平均碰撞密钥对: {report['per_plaintext']['colliding_key_pairs_mean']:.0f}, "
+              f"用时 {elapsed:.3f}秒 {'✅' if groups_ok else '❌'}")
+        if groups_ok:
+            security_score += 1
+        
+        total_tests = 4
         success_rate = (security_score / total_tests) * 100
         
         print(f"\n📊 第5关测试结果: {security_score}/{total_tests} 通过 ({success_rate:.1f}%)")
@@ -360,11 +407,661 @@ class SDESTester:
         self.test_results.append(("第5关：密钥碰撞和安全性", security_score == total_tests))
         return security_score == total_tests
     
+    def test_level_6_engine_consistency(self):
+        """第6关：整数引擎与查表引擎一致性测试"""
+        self.print_separator("第6关：整数引擎与查表引擎一致性测试")
+        
+        key = "1010000010"
+        prepared = self.sdes.prepare_key(key)
+        codebook = CodebookEngine(self.sdes)
+        
+        passed = 0
+        total = 8
+        
+        # 字符串接口与整数接口一致
+        string_results = [int(self.sdes.encrypt_block(format(b, '08b'), key), 2) for b in range(256)]
+        int_results = [self.sdes.encrypt_int(b, int(key, 2)) for b in range(256)]
+        if string_results == int_results:
+            passed += 1
+        print(f"字符串接口 vs 整数接口: {'✅ 一致' if string_results == int_results else '❌ 不一致'}")
+        
+        # 预处理密钥的代换表与逐块加密一致
+        table_ok = list(prepared.encrypt_table) == int_results
+        if table_ok:
+            passed += 1
+        print(f"预处理密钥代换表: {'✅ 一致' if table_ok else '❌ 不一致'}")
+        
+        # 码本引擎与整数引擎一致
+        codebook_ok = all(
+            codebook.encrypt_int(b, k) == self.sdes.encrypt_int(b, k)
+            and codebook.decrypt_int(codebook.encrypt_int(b, k), k) == b
+            for k in range(0, 1024, 37) for b in range(256)
+        )
+        # 越界数据块不能读到相邻密钥的码本行
+        for call in (lambda: codebook.encrypt_int(256, 0), lambda: codebook.decrypt_int(-1, 0),
+                     lambda: codebook.encrypt_block("100000000", key)):
+            try:
+                call()
+                codebook_ok = False
+            except ValueError:
+                pass
+        if codebook_ok:
+            passed += 1
+        print(f"码本引擎: {'✅ 一致' if codebook_ok else '❌ 不一致'}")
+        
+        # NumPy向量化引擎：单个密钥、逐元素密钥数组与解密均与整数引擎一致，越界输入报错
+        import numpy as np
+        from sdes_vectorized import VectorizedSDES
+        vectorized = VectorizedSDES(self.sdes)
+        blocks = np.arange(256, dtype=np.uint8)
+        keys = (np.arange(256, dtype=np.uint16) * 37) % 1024
+        encrypted = vectorized.encrypt(blocks, keys)
+        vector_ok = (vectorized.encrypt(blocks, key).tolist() == int_results
+                     and encrypted.tolist() == [self.sdes.encrypt_int(b, int(k)) for b, k in zip(range(256), keys)]
+                     and vectorized.decrypt(encrypted, keys).tolist() == list(range(256)))
+        for call in (lambda: vectorized.encrypt([256], 0), lambda: vectorized.decrypt(blocks, [-1] * 256),
+                     lambda: vectorized.encrypt(blocks, np.full(256, 1024, dtype=np.uint16))):
+            try:
+                call()
+                vector_ok = False
+            except ValueError:
+                pass
+        if vector_ok:
+            passed += 1
+        print(f"向量化引擎: {'✅ 一致' if vector_ok else '❌ 不一致'}")
+        
+        # 位切片引擎：随机通道的批量加解密、单值广播与位平面打包均与整数引擎一致
+        bitsliced = BitslicedSDES(self.sdes)
+        rng = random.Random(6)
+        lane_blocks = [rng.randrange(256) for _ in range(500)]
+        lane_keys = [rng.randrange(1024) for _ in range(500)]
+        lane_encrypted = bitsliced.encrypt_many(lane_blocks, lane_keys)
+        bitslice_ok = (lane_encrypted == [self.sdes.encrypt_int(b, k) for b, k in zip(lane_blocks, lane_keys)]
+                       and bitsliced.decrypt_many(lane_encrypted, lane_keys) == lane_blocks
+                       and bitsliced.encrypt_many(lane_blocks, int(key, 2)) == [prepared.encrypt_table[b] for b in lane_blocks]
+                       and bitsliced.decrypt_many(0x5A, lane_keys) == [self.sdes.decrypt_int(0x5A, k) for k in lane_keys]
+                       and BitslicedSDES.unpack(BitslicedSDES.pack(lane_keys, 10), len(lane_keys)) == lane_keys
+                       and bitsliced.encrypt_many([], []) == [])
+        if bitslice_ok:
+            passed += 1
+        print(f"位切片引擎: {len(lane_keys)} 个随机通道 {'✅ 一致' if bitslice_ok else '❌ 不一致'}")
+        
+        # 完整码本构建统计
+        full_codebook = CodebookEngine(self.sdes, lazy_rows=False)
+        full_ok = full_codebook.encrypt_block("10111101", key) == self.sdes.encrypt_block("10111101", key)
+        stats = full_codebook.stats()
+        # 按行模式只占用已生成行的内存（每行加密、解密各256字节）
+        lazy_stats = codebook.stats()
+        lazy_ok = lazy_stats["memory_bytes"] == lazy_stats["rows_built"] * 512 + 1024 < stats["memory_bytes"]
+        if full_ok and lazy_ok and stats["rows_built"] == 1024:
+            passed += 1
+        print(f"完整码本: 构建 {stats['rows_built']} 行, 用时 {stats['build_time']:.4f}秒, "
+              f"内存 {stats['memory_bytes'] // 1024} KiB; 按行模式 {lazy_stats['rows_built']} 行, "
+              f"内存 {lazy_stats['memory_bytes'] // 1024} KiB {'✅' if full_ok and lazy_ok else '❌'}")
+        
+        # 共享内存码本按名称挂接后与原码本一致
+        with SharedCodebook(full_codebook) as shared:
+            attached = attach_codebook(shared.name)
+            shared_ok = (bytes(attached.encrypt_table) == bytes(full_codebook.encrypt_table)
+                         and bytes(attached.decrypt_table) == bytes(full_codebook.decrypt_table))
+            del attached
+            detach(shared.name)
+        if shared_ok:
+            passed += 1
+        print(f"共享内存码本: {'✅ 一致' if shared_ok else '❌ 不一致'}")
+        
+        # 重新赋值参数后查找表随之重建，子密钥信息与加密实际使用的一致；参数不可原地修改
+        modified = SDES()
+        stale = modified.prepare_key(key)
+        modified.P8 = [9, 10, 5, 8, 4, 7, 3, 6]
+        info = modified.get_key_info(key)
+        k1, k2 = modified.generate_keys(key)
+        try:
+            modified.S1[0][0] = 2
+            frozen = False
+        except TypeError:
+            frozen = True
+        parameter_ok = (frozen
+                        and info["k1"] == format(modified.prepare_key(key).k1, '08b') == ''.join(map(str, k1))
+                        and info["k2"] == format(modified.prepare_key(key).k2, '08b') == ''.join(map(str, k2))
+                        and info["k1"] != self.sdes.get_key_info(key)["k1"]
+                        # 参数变化前预处理的密钥按新参数重新处理
+                        and modified.prepare_key(stale) is modified.prepare_key(key)
+                        and modified.encrypt_bytes(b'abc', stale) == modified.encrypt_bytes(b'abc', key)
+                        and modified.encrypt_int(5, stale) == modified.encrypt_int(5, key))
+        if parameter_ok:
+            passed += 1
+        print(f"参数重新赋值: K1={info['k1']} K2={info['k2']} {'✅ 查找表已重建' if parameter_ok else '❌ 不一致'}")
+        
+        print(f"\n📊 第6关测试结果: {passed}/{total} 通过")
+        
+        self.test_results.append(("第6关：引擎一致性", passed == total))
+        return passed == total
+    
+    def test_level_7_multi_pair_recovery(self):
+        """第7关：已知明文索引与多对密钥恢复测试"""
+        self.print_separator("第7关：已知明文索引与多对密钥恢复测试")
+        
+        key = "1010000010"
+        plaintexts = ["10111101", "00000011", "01001101", "11001000", "00001001"]
+        pairs = [(int(p, 2), int(self.sdes.encrypt_block(p, key), 2)) for p in plaintexts]
+        
+        index = KnownPlaintextIndex()
+        start_time = time.perf_counter()
+        index.build()
+        print(f"索引构建: {time.perf_counter() - start_time:.4f}秒, {index.memory_usage() // 1024} KiB")
+        
+        passed = 0
+        total = 5
+        
+        # 单对查询与暴力搜索一致
+        plaintext, ciphertext = pairs[0]
+        index_keys = [format(k, '010b') for k in index.candidates(plaintext, ciphertext)]
+        search_keys = list(self.sdes.search_keys(plaintext, ciphertext))
+        if index_keys == search_keys:
+            passed += 1
+        print(f"单对查询: {len(index_keys)} 个候选 {'✅ 与暴力搜索一致' if index_keys == search_keys else '❌ 不一致'}")
+        
+        # 批量查询：逐对循环、NumPy整体收集（CSR结果）与单对查询一致
+        import numpy as np
+        batch = [(p, c) for p in range(0, 256, 5) for c in range(0, 256, 3)]
+        expected = [index.candidates(p, c) for p, c in batch]
+        bounds, flat = index.candidates_csr(np.array(batch))
+        batch_ok = (index.candidates_many(batch) == expected == index.candidates_many(np.array(batch))
+                    and [flat[a:b].tolist() for a, b in zip(bounds, bounds[1:])] == expected
+                    and index.count_many(batch) == index.count_many(np.array(batch)).tolist()
+                    == [len(keys) for keys in expected])
+        # 越界的明文或密文不能别名到其他槽位（如 (0, 257) 会落到 (1, 1)）
+        for call in (lambda: index.candidates(0, 257), lambda: index.count(-1, 0),
+                     lambda: index.candidate_bitset(256, 0), lambda: index.candidates_many([(1, 300)]),
+                     lambda: index.count_many(np.array([[0, 1], [0, 256]])),
+                     lambda: index.candidates_csr(np.array([[-1, 0]])), lambda: index.recover_keys([(0, 256)])):
+            try:
+                call()
+                batch_ok = False
+            except ValueError:
+                pass
+        if batch_ok:
+            passed += 1
+        print(f"批量查询: {len(batch)} 对 {'✅ 一致' if batch_ok else '❌ 不一致'}")
+        
+        # 多对求交恢复唯一密钥
+        result = index.recover_keys(pairs)
+        print(f"多对恢复: 使用 {result['pairs_used']}/{result['pairs_total']} 对, "
+              f"候选数 {' -> '.join(map(str, result['history']))}")
+        if result['keys'] == [key]:
+            passed += 1
+        print(f"恢复密钥: {result['keys']} {'✅' if result['keys'] == [key] else '❌'}")
+        
+        # 已知片段拖动搜索：小分块读取，片段跨越分块边界
+        crib = b"%PDF-1.7"
+        data = bytes(range(200)) + crib + bytes(range(50))
+        hits = list(crib_search(self.sdes.encrypt_bytes(data, key), crib, index, chunk_size=203))
+        crib_ok = (200, key) in hits and all(offset == 200 for offset, _ in hits)
+        print(f"已知片段搜索: {hits} {'✅' if crib_ok else '❌'}")
+        if crib_ok:
+            passed += 1
+        
+        # 磁盘缓存：首次生成，再次mmap加载；修改S盒后自动重建
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "tables.bin")
+            first = TableCache(path)
+            second = TableCache(path)
+            modified = SDES()
+            s1 = [list(row) for row in modified.S1]
+            s1[0][0], s1[0][1] = s1[0][1], s1[0][0]
+            modified.S1 = s1
+            third = TableCache(path, modified)
+            # 对照：直接以交换后的S盒新建的实例
+            fresh = SDES()
+            fresh.S1 = s1
+            fresh_codebook = CodebookEngine.full(fresh)
+            cache_ok = (first.rebuilt and not second.rebuilt and third.rebuilt
+                        and second.index.candidates(plaintext, ciphertext) == index.candidates(plaintext, ciphertext)
+                        and second.codebook.encrypt_int(plaintext, key) == ciphertext
+                        and bytes(third.codebook.encrypt_table) != bytes(first.codebook.encrypt_table)
+                        and bytes(third.codebook.encrypt_table) == bytes(fresh_codebook.encrypt_table))
+            print(f"磁盘缓存: mmap加载 {second.load_time * 1000:.1f} ms (构建 {first.load_time * 1000:.1f} ms) "
+                  f"{'✅' if cache_ok else '❌'}")
+            del first, second, third
+        if cache_ok:
+            passed += 1
+        
+        print(f"\n📊 第7关测试结果: {passed}/{total} 通过")
+        
+        self.test_results.append(("第7关：多对密钥恢复", passed == total))
+        return passed == total
+    
+    def test_level_8_block_modes(self):
+        """第8关：分组密码工作模式测试"""
+        self.print_separator("第8关：分组密码工作模式测试")
+        
+        key = "1010000010"
+        data = "S-DES 工作模式测试：CBC/CFB/OFB/CTR".encode('utf-8') * 20
+        
+        passed = 0
+        total = len(MODES)
+        
+        for mode in MODES:
+            try:
+                # 分块加密
+                encryptor = new_encryptor(mode, key, iv=0b10111101)
+                ciphertext = b''.join(encryptor.update(data[i:i + 37]) for i in range(0, len(data), 37))
+                ciphertext += encryptor.finalize()
+                
+                # 分块解密（块大小与加密不同）
+                decryptor = new_decryptor(mode, key, iv=encryptor.iv)
+                decrypted = b''.join(decryptor.update(ciphertext[i:i + 100]) for i in range(0, len(ciphertext), 100))
+                decrypted += decryptor.finalize()
+                
+                # 逐块对照：第一个字节的处理与单块加密一致
+                first = self.sdes.encrypt_int(data[0] ^ encryptor.iv, key) if mode == 'cbc' else None
+                first_ok = first is None or ciphertext[0] == first
+                
+                is_correct = decrypted == data and len(ciphertext) == len(data) and first_ok
+                print(f"{mode.upper():4}: {'✅ 往返正确' if is_correct else '❌ 错误'}")
+                if is_correct:
+                    passed += 1
+            except Exception as e:
+                print(f"{mode.upper():4}: ❌ 错误 - {str(e)}")
+        
+        # 已知答案：分块结果与逐字节参考实现一致，分块边界跨越256字节的密钥流周期
+        total += 1
+        data = bytes((i * 7 + 3) & 0xFF for i in range(700))
+        bounds = [0, 1, 255, 256, 257, 300, 511, 513, 640, 700]
+        decrypt_bounds = [0, 128, 384, 385, 700]
+        
+        def reference(mode, iv):
+            state, output = iv, bytearray()
+            for i, byte in enumerate(data):
+                if mode == 'ecb':
+                    output.append(self.sdes.encrypt_int(byte, key))
+                elif mode == 'cbc':
+                    state = self.sdes.encrypt_int(byte ^ state, key)
+                    output.append(state)
+                elif mode == 'cfb':
+                    state = byte ^ self.sdes.encrypt_int(state, key)
+                    output.append(state)
+                elif mode == 'ofb':
+                    state = self.sdes.encrypt_int(state, key)
+                    output.append(byte ^ state)
+                else:
+                    output.append(byte ^ self.sdes.encrypt_int((iv + i) & 0xFF, key))
+            return bytes(output)
+        
+        known_answer_ok = True
+        for mode in MODES:
+            for iv in (0b10111101, 0, 255):
+                expected = reference(mode, iv)
+                encryptor = new_encryptor(mode, key, iv=iv)
+                chunked = b''.join(encryptor.update(data[a:b]) for a, b in zip(bounds, bounds[1:]))
+                decryptor = new_decryptor(mode, key, iv=iv)
+                decrypted = b''.join(decryptor.update(expected[a:b]) for a, b in zip(decrypt_bounds, decrypt_bounds[1:]))
+                known_answer_ok = known_answer_ok and chunked == expected and decrypted == data
+        print(f"逐字节参考实现: {'✅ 全部模式一致' if known_answer_ok else '❌ 不一致'}")
+        if known_answer_ok:
+            passed += 1
+        
+        # 置换循环结构：OFB周期等于IV所在循环的长度；全0密钥是对合（加密两次还原）
+        total += 1
+        row = self.sdes.prepare_key(key).encrypt_table
+        lengths = cycle_decomposition(row)
+        cycles_ok = (all(len(ofb_cycle(key, iv)) == lengths[iv] for iv in range(256))
+                     and permutation_summary(self.sdes.prepare_key("0000000000").encrypt_table)["involution"])
+        summary = permutation_summary(row)
+        print(f"循环结构: 阶 {summary['order']}, 不动点 {len(summary['fixed_points'])} 个, "
+              f"平均OFB周期 {summary['mean_ofb_period']:.1f} {'✅' if cycles_ok else '❌'}")
+        if cycles_ok:
+            passed += 1
+        
+        print(f"\n📊 第8关测试结果: {passed}/{total} 通过")
+        
+        self.test_results.append(("第8关：工作模式", passed == total))
+        return passed == total
+    
+    def test_level_9_cryptanalysis(self):
+        """第9关：差分与线性密码分析测试"""
+        self.print_separator("第9关：差分与线性密码分析测试")
+        
+        # 依赖NumPy，按需导入
+        import numpy as np
+        from sdes_cryptanalysis import (cipher_difference_table, difference_distribution_table,
+                                        f_difference_table, encryption_oracle, differential_attack,
+                                        linear_approximation_table, linear_attack)
+        from sdes_vectorized import VectorizedSDES
+        
+        passed = 0
+        total = 6
+        
+        # 差分分布表：每行总数16，零输入差分只能得到零输出差分
+        ddt_ok = all(
+            (ddt.sum(axis=1) == 16).all() and ddt[0, 0] == 16
+            for ddt in (difference_distribution_table(self.sdes.S1), difference_distribution_table(self.sdes.S2))
+        )
+        if ddt_ok:
+            passed += 1
+        print(f"S盒差分分布表: {'✅ 正确' if ddt_ok else '❌ 错误'}")
+        
+        # 经EP/S盒/SP传播的F差分概率与直接枚举F表一致
+        table = f_difference_table(self.sdes)
+        f_table, ep_table = self.sdes.f_table, self.sdes.ep_table
+        f_ok = all(
+            abs(table[delta][out] - sum(1 for x in range(256)
+                                        if f_table[x] ^ f_table[x ^ ep_table[delta]] == out) / 256) < 1e-12
+            for delta in range(16) for out in range(16)
+        )
+        if f_ok:
+            passed += 1
+        print(f"轮函数差分传播: {'✅ 与枚举一致' if f_ok else '❌ 不一致'}")
+        
+        # 两轮差分转移概率：每行和为1；固定明文时对全部 (K1, K2) 枚举得到的密文差分分布与表中一行相同
+        cipher_table = cipher_difference_table(self.sdes)
+        vectorized = VectorizedSDES(self.sdes)
+        k1, k2 = (subkeys.ravel() for subkeys in np.meshgrid(np.arange(256, dtype=np.uint8),
+                                                              np.arange(256, dtype=np.uint8), indexing='ij'))
+        cipher_ok = np.allclose(cipher_table.sum(axis=1), 1) and cipher_table[0, 0] == 1
+        for plaintext, delta in ((0x00, 0x01), (0xA5, 0x81), (0x3C, 0xFF), (0x5A, 0x24)):
+            outputs = (vectorized._feistel(np.full(k1.size, plaintext, dtype=np.uint8), k1, k2)
+                       ^ vectorized._feistel(np.full(k1.size, plaintext ^ delta, dtype=np.uint8), k1, k2))
+            observed = np.bincount(outputs, minlength=256) / k1.size
+            cipher_ok = cipher_ok and np.abs(observed - cipher_table[delta]).max() < 1e-12
+        if cipher_ok:
+            passed += 1
+        print(f"两轮差分转移表: {'✅ 与子密钥枚举一致' if cipher_ok else '❌ 不一致'}")
+        
+        # 选择明文攻击恢复密钥（可能附带等价密钥）
+        key = "1010000010"
+        result = differential_attack(encryption_oracle(key, self.sdes), self.sdes, seed=1)
+        attack_ok = key in result["keys"] and result["queries"] < 1024
+        if attack_ok:
+            passed += 1
+        print(f"差分攻击: 候选 {result['keys']}, 查询 {result['queries']} 次, "
+              f"S盒查表 {result['sbox_lookups']} 次, 验证加密 {result['trial_encryptions']} 次 "
+              f"(穷举 {result['brute_force_encryptions']} 次) {'✅' if attack_ok else '❌'}")
+        
+        # 线性逼近表：空掩码恒成立，输出掩码为0时其余输入掩码无偏差
+        lat_ok = all(
+            lat[0, 0] == 8 and (lat[1:, 0] == 0).all()
+            for lat in (linear_approximation_table(self.sdes.S1), linear_approximation_table(self.sdes.S2))
+        )
+        if lat_ok:
+            passed += 1
+        print(f"S盒线性逼近表: {'✅ 正确' if lat_ok else '❌ 错误'}")
+        
+        # 已知明文线性攻击
+        plaintexts = list(range(0, 256, 8))
+        ciphertexts = [self.sdes.encrypt_int(p, key) for p in plaintexts]
+        result = linear_attack(plaintexts, ciphertexts, self.sdes)
+        linear_ok = key in result["keys"]
+        if linear_ok:
+            passed += 1
+        print(f"线性攻击: {result['pairs']} 对已知明文, 候选 {result['keys']}, 验证 {result['trial_keys']} 个密钥 "
+              f"{'✅' if linear_ok else '❌'}")
+        
+        print(f"\n📊 第9关测试结果: {passed}/{total} 通过")
+        
+        self.test_results.append(("第9关：密码分析", passed == total))
+        return passed == total
+    
+    def test_level_10_statistical_quality(self):
+        """第10关：雪崩效应与统计质量测试"""
+        self.print_separator("第10关：雪崩效应与统计质量测试")
+        
+        # 依赖NumPy/matplotlib，按需导入
+        from sdes_quality import quality_report, render_charts
+        
+        passed = 0
+        total = 4
+        
+        codebook = CodebookEngine.full(self.sdes)
+        report = quality_report(codebook)
+        table = bytes(codebook.encrypt_table)
+        
+        # 汉明距离分布覆盖全部 (密钥, 明文, 翻转位)，平均翻转位数与概率矩阵行和一致
+        sweep_ok = True
+        for name, flips in (("plaintext_avalanche", 8), ("key_avalanche", 10)):
+            histogram = report[name]["distance_histogram"]
+            mean_distance = sum(d * n for d, n in enumerate(histogram)) / sum(histogram)
+            sweep_ok = sweep_ok and sum(histogram) == 1024 * 256 * flips and \
+                abs(mean_distance - report[name]["mean_flipped_bits"]) < 1e-9
+        if sweep_ok:
+            passed += 1
+        print(f"全空间翻转统计: {report['evaluations']} "
+              f"(用时 {report['time']:.3f}秒) {'✅' if sweep_ok else '❌'}")
+        
+        # 与逐个查表计算的结果一致：翻转密钥第1位时密文第1位翻转的概率
+        flips = sum(
+            (table[(key << 8) | p] ^ table[((key ^ 0x200) << 8) | p]) >> 7
+            for key in range(1024) for p in range(256)
+        )
+        scalar_ok = abs(report["key_avalanche"]["matrix"][0][0] - flips / (1024 * 256)) < 1e-6
+        if scalar_ok:
+            passed += 1
+        print(f"密钥雪崩矩阵: {'✅ 与逐个计算一致' if scalar_ok else '❌ 不一致'}")
+        
+        # 卡方统计量与逐个计数一致
+        column = [table[(key << 8) | 0b10111101] for key in range(1024)]
+        chi_square = sum((column.count(c) - 4) ** 2 / 4 for c in range(256))
+        chi_ok = abs(report["output_chi_square"]["statistics"][0b10111101] - chi_square) < 1e-3
+        if chi_ok:
+            passed += 1
+        print(f"输出分布卡方: 均值 {report['output_chi_square']['mean']:.1f} "
+              f"(自由度 {report['output_chi_square']['dof']}) {'✅' if chi_ok else '❌'}")
+        
+        # 生成PNG图表
+        with tempfile.TemporaryDirectory() as directory:
+            paths = render_charts(report, directory)
+            charts_ok = len(paths) == 5 and all(
+                open(path, 'rb').read(8) == b'\x89PNG\r\n\x1a\n' for path in paths
+            )
+        if charts_ok:
+            passed += 1
+        print(f"PNG图表: {len(paths)} 张 {'✅' if charts_ok else '❌'}")
+        
+        print(f"\n📊 第10关测试结果: {passed}/{total} 通过")
+        
+        self.test_results.append(("第10关：统计质量", passed == total))
+        return passed == total
+    
+    def test_level_11_attacks(self):
+        """第11关：多重加密与攻击测试"""
+        self.print_separator("第11关：多重加密与攻击测试")
+        
+        passed = 0
+        total = 6
+        
+        # 双重加密：解密还原全部数据块，等于两次单重加密
+        double_key = "10100000100111001101"
+        k1, k2 = double_key[:10], double_key[10:]
+        double_ok = all(
+            self.sdes.double_decrypt_int(self.sdes.double_encrypt_int(b, double_key), double_key) == b
+            and self.sdes.double_encrypt_int(b, double_key) == self.sdes.encrypt_int(self.sdes.encrypt_int(b, k1), k2)
+            for b in range(256)
+        ) and self.sdes.double_decrypt_block(self.sdes.double_encrypt_block("10111101", double_key),
+                                             double_key) == "10111101"
+        if double_ok:
+            passed += 1
+        print(f"双重加密往返: {'✅ 正确' if double_ok else '❌ 错误'}")
+        
+        # 中间相遇攻击恢复20位密钥，结果与穷举搜索一致
+        codebook = CodebookEngine.full(self.sdes)
+        pairs = [(p, self.sdes.double_encrypt_int(p, double_key)) for p in (0x3C, 0xA5, 0x00, 0xFF, 0x5A, 0x81)]
+        mitm = meet_in_the_middle(pairs, codebook)
+        exhaustive = exhaustive_double_search(pairs, codebook)
+        mitm_ok = double_key in mitm["keys"] and mitm["keys"] == exhaustive["keys"]
+        if mitm_ok:
+            passed += 1
+        print(f"中间相遇攻击: 候选 {mitm['keys']}, 用时 {mitm['time']:.4f}秒 "
+              f"(穷举 {exhaustive['time']:.4f}秒) {'✅ 与穷举一致' if mitm_ok else '❌ 不一致'}")
+        
+        # 三重加密（EDE）：双密钥与三密钥模式均可还原，且双密钥模式等于 k3 = k1
+        t1, t2, t3 = 0b1010000010, 0b0111001101, 0b1100011010
+        triple_ok = all(
+            self.sdes.triple_decrypt_int(self.sdes.triple_encrypt_int(b, t1, t2, t3), t1, t2, t3) == b
+            and self.sdes.triple_decrypt_int(self.sdes.triple_encrypt_int(b, t1, t2), t1, t2) == b
+            and self.sdes.triple_encrypt_int(b, t1, t2) == self.sdes.triple_encrypt_int(b, t1, t2, t1)
+            for b in range(256)
+        )
+        if triple_ok:
+            passed += 1
+        print(f"三重加密往返: {'✅ 正确' if triple_ok else '❌ 错误'}")
+        
+        # 双密钥搜索（单进程），带检查点：删掉含真实密钥的分片后重新运行，从检查点恢复并补算该分片
+        pairs = [(p, self.sdes.triple_encrypt_int(p, t1, t2)) for p in (0x3C, 0xA5, 0x00, 0xFF)]
+        expected = f"{t1:010b} {t2:010b}"
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint = os.path.join(directory, "search.json")
+            first = TripleKeySearch(pairs, workers=1, checkpoint_path=checkpoint).run()
+            with open(checkpoint, encoding='utf-8') as f:
+                state = json.load(f)
+            shard = t1 // state["shard_size"]
+            state["completed"].remove(shard)
+            state["found"] = [key for key in state["found"] if (key >> 10) // state["shard_size"] != shard]
+            state["checked"] -= state["shard_size"] * 1024
+            with open(checkpoint, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            second = TripleKeySearch(pairs, workers=1, checkpoint_path=checkpoint).run()
+        search_ok = (expected in first["keys"] and not first["resumed"] and second["resumed"]
+                     and second["keys"] == first["keys"] and second["checked"] == first["checked"] == 1 << 20)
+        if search_ok:
+            passed += 1
+        print(f"双密钥搜索: 候选 {first['keys']}, 用时 {first['time']:.3f}秒, 检查点恢复 "
+              f"{'✅ 结果一致' if search_ok else '❌ 不一致'}")
+        
+        # 三密钥搜索：只搜索真实第一重密钥所在的分片（完整2^30空间在测试中过大）
+        pairs = [(p, self.sdes.triple_encrypt_int(p, t1, t2, t3)) for p in (0x3C, 0xA5, 0x00, 0xFF, 0x5A, 0x81)]
+        found, checked = search_shard(codebook, t1, t1 + 1, pairs, three_keys=True)
+        three_ok = (((t1 << 10) | t2) << 10) | t3 in found and checked == 1 << 20
+        if three_ok:
+            passed += 1
+        print(f"三密钥分片搜索: {len(found)} 个候选 {'✅ 包含真实密钥' if three_ok else '❌ 未找到'}")
+        
+        # 仅密文攻击：只凭文本密文的字节频率恢复密钥
+        key = "1010000010"
+        sample = "Known plaintext is not always available, but the ciphertext of ordinary text is."
+        encrypted_text = self.sdes.encrypt_ascii(sample, key)
+        ranking = ciphertext_only_attack(encrypted_text, codebook)
+        cipher_only_ok = self.sdes.decrypt_ascii(encrypted_text, ranking['keys'][0]) == sample
+        # 文件对象按块流式统计，结果与整体统计相同
+        raw = encrypted_text.encode('latin-1')
+        streamed = ciphertext_only_attack(io.BytesIO(raw), codebook)
+        cipher_only_ok = (cipher_only_ok and streamed['keys'] == ranking['keys']
+                          and byte_histogram(io.BytesIO(raw), chunk_size=7) == byte_histogram(encrypted_text)
+                          == [raw.count(value) for value in range(256)])
+        if cipher_only_ok:
+            passed += 1
+        print(f"仅密文攻击: 最高分密钥 {ranking['keys'][0]}, 用时 {ranking['time']:.4f}秒 "
+              f"{'✅' if cipher_only_ok else '❌'}")
+        
+        print(f"\n📊 第11关测试结果: {passed}/{total} 通过")
+        
+        self.test_results.append(("第11关：多重加密与攻击", passed == total))
+        return passed == total
+    
+    def test_level_12_file_io(self):
+        """第12关：文件加密解密测试"""
+        self.print_separator("第12关：文件加密解密测试")
+        
+        key = "1010000010"
+        data = bytes((i * 131 + (i >> 8)) & 0xFF for i in range(50000))
+        
+        passed = 0
+        total = 3
+        
+        # 多进程分块：小分块使大量分块同时在途，按顺序写回后与单个处理器的结果一致
+        with tempfile.TemporaryDirectory() as directory:
+            src = os.path.join(directory, "plain.bin")
+            encrypted_path = os.path.join(directory, "encrypted.bin")
+            decrypted_path = os.path.join(directory, "decrypted.bin")
+            with open(src, 'wb') as f:
+                f.write(data)
+            
+            parallel_ok = True
+            for mode in MODES:
+                encrypted = encrypt_file(src, encrypted_path, key, mode=mode, iv=0b10111101,
+                                         workers=2, chunk_size=997)
+                decrypted = decrypt_file(encrypted_path, decrypted_path, key, mode=mode, iv=encrypted["iv"],
+                                         workers=2, chunk_size=1500)
+                with open(encrypted_path, 'rb') as f:
+                    ciphertext = f.read()
+                with open(decrypted_path, 'rb') as f:
+                    plaintext = f.read()
+                mode_ok = (ciphertext == new_encryptor(mode, key, iv=0b10111101).update(data)
+                           and plaintext == data and decrypted["parallel"]
+                           and encrypted["parallel"] == (mode in PARALLEL_ENCRYPT_MODES))
+                parallel_ok = parallel_ok and mode_ok
+                print(f"{mode.upper():4}: 加密{'并行' if encrypted['parallel'] else '顺序'}, "
+                      f"解密{'并行' if decrypted['parallel'] else '顺序'} {'✅' if mode_ok else '❌'}")
+        if parallel_ok:
+            passed += 1
+        
+        # mmap原地处理：切片大小不整除文件大小，另测空文件
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "inplace.bin")
+            empty = os.path.join(directory, "empty.bin")
+            inplace_ok = True
+            for mode in MODES:
+                with open(path, 'wb') as f:
+                    f.write(data)
+                encrypted = encrypt_file_inplace(path, key, mode=mode, iv=0b01000010, slice_size=4099)
+                with open(path, 'rb') as f:
+                    ciphertext = f.read()
+                decrypt_file_inplace(path, key, mode=mode, iv=encrypted["iv"], slice_size=3001)
+                with open(path, 'rb') as f:
+                    plaintext = f.read()
+                
+                open(empty, 'wb').close()
+                empty_result = encrypt_file_inplace(empty, key, mode=mode, iv=0b01000010, slice_size=4099)
+                inplace_ok = (inplace_ok and ciphertext == new_encryptor(mode, key, iv=0b01000010).update(data)
+                              and plaintext == data and encrypted["bytes"] == len(data)
+                              and empty_result["bytes"] == 0 and os.path.getsize(empty) == 0)
+            # 输出文件与输入文件相同时拒绝处理，输入不被清空
+            try:
+                encrypt_file(path, path, key, mode='ctr', iv=0b01000010, workers=1)
+                inplace_ok = False
+            except ValueError:
+                inplace_ok = inplace_ok and os.path.getsize(path) == len(data)
+        if inplace_ok:
+            passed += 1
+        print(f"mmap原地加解密: {'✅ 全部模式往返正确' if inplace_ok else '❌ 错误'}")
+        
+        # 写入调用方缓冲区：源与目标为同一个bytearray（切片较小，跨越多个切片）；处理器的update_into写入memoryview
+        sliced = SDES()
+        sliced.INTO_SLICE_SIZE = 4093
+        buffer = bytearray(data)
+        written = sliced.encrypt_into(buffer, buffer, key)
+        into_ok = written == len(data) and bytes(buffer) == self.sdes.encrypt_bytes(data, key)
+        sliced.decrypt_into(memoryview(buffer), buffer, key)
+        into_ok = into_ok and bytes(buffer) == data
+        out = bytearray(len(data) + 8)
+        into_ok = (into_ok and new_encryptor('cbc', key, iv=7).update_into(data, memoryview(out)) == len(data)
+                   and bytes(out[:len(data)]) == new_encryptor('cbc', key, iv=7).update(data))
+        try:
+            self.sdes.encrypt_into(data, bytearray(10), key)
+            into_ok = False
+        except ValueError:
+            pass
+        # 处理器的目标缓冲区不足时报错，且链接状态不前进（随后的正常调用结果不受影响）
+        chained = new_encryptor('cbc', key, iv=7)
+        try:
+            chained.update_into(data[:100], bytearray(99))
+            into_ok = False
+        except ValueError:
+            into_ok = into_ok and chained.update(data) == new_encryptor('cbc', key, iv=7).update(data)
+        if into_ok:
+            passed += 1
+        print(f"写入调用方缓冲区: {'✅ 正确' if into_ok else '❌ 错误'}")
+        
+        print(f"\n📊 第12关测试结果: {passed}/{total} 通过")
+        
+        self.test_results.append(("第12关：文件加密解密", passed == total))
+        return passed == total
+    
     def run_all_tests(self):
         """运行所有测试"""
         self.print_separator("S-DES算法完整测试套件")
         
-        print("🎯 开始运行5个测试关卡...")
+        print("🎯 开始运行12个测试关卡...")
         print("每个关卡将验证算法的不同方面")
         
         start_time = time.time()
@@ -376,6 +1073,13 @@ class SDESTester:
         results.append(self.test_level_3_ascii_encryption())
         results.append(self.test_level_4_brute_force())
         results.append(self.test_level_5_key_collision())
+        results.append(self.test_level_6_engine_consistency())
+        results.append(self.test_level_7_multi_pair_recovery())
+        results.append(self.test_level_8_block_modes())
+        results.append(self.test_level_9_cryptanalysis())
+        results.append(self.test_level_10_statistical_quality())
+        results.append(self.test_level_11_attacks())
+        results.append(self.test_level_12_file_io())
         
         end_time = time.time()
         total_time = end_time - start_time
@@ -428,8 +1132,15 @@ def main():
         print("3. 第3关：ASCII字符串加密测试")
         print("4. 第4关：暴力破解测试")
         print("5. 第5关：密钥碰撞和安全性测试")
+        print("6. 第6关：整数引擎与查表引擎一致性测试")
+        print("7. 第7关：已知明文索引与多对密钥恢复测试")
+        print("8. 第8关：分组密码工作模式测试")
+        print("9. 第9关：差分与线性密码分析测试")
+        print("10. 第10关：雪崩效应与统计质量测试")
+        print("11. 第11关：多重加密与攻击测试")
+        print("12. 第12关：文件加密解密测试")
         
-        level_choice = input("请选择关卡 (1-5): ").strip()
+        level_choice = input("请选择关卡 (1-12): ").strip()
         
         if level_choice == "1":
             tester.test_level_1_basic_encryption()
@@ -441,6 +1152,20 @@ def main():
             tester.test_level_4_brute_force()
         elif level_choice == "5":
             tester.test_level_5_key_collision()
+        elif level_choice == "6":
+            tester.test_level_6_engine_consistency()
+        elif level_choice == "7":
+            tester.test_level_7_multi_pair_recovery()
+        elif level_choice == "8":
+            tester.test_level_8_block_modes()
+        elif level_choice == "9":
+            tester.test_level_9_cryptanalysis()
+        elif level_choice == "10":
+            tester.test_level_10_statistical_quality()
+        elif level_choice == "11":
+            tester.test_level_11_attacks()
+        elif level_choice == "12":
+            tester.test_level_12_file_io()
         else:
             print("无效选择")
     
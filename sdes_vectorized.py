@@ -0,0 +1,76 @@
+"""
+基于NumPy的S-DES向量化批量引擎
+"""
+
+from typing import Optional
+
+import numpy as np
+
+from sdes_algorithm import SDES, PreparedKey
+
+
+class VectorizedSDES:
+    """S-DES向量化引擎：对uint8数据块数组整体执行查表运算"""
+
+    def __init__(self, sdes: Optional[SDES] = None):
+        self.sdes = sdes or SDES()
+        self.build_tables()
+
+    def build_tables(self):
+        """将SDES的整数查找表转换为NumPy数组"""
+        sdes = self.sdes
+        self.ip_table = np.array(sdes.ip_table, dtype=np.uint8)
+        self.ip_inv_table = np.array(sdes.ip_inv_table, dtype=np.uint8)
+        self.ep_table = np.array(sdes.ep_table, dtype=np.uint8)
+        self.f_table = np.array(sdes.f_table, dtype=np.uint8)
+
+        # 全部1024个密钥的子密钥表
+        subkeys = [sdes.generate_subkeys_int(key) for key in range(1024)]
+        self.k1_table = np.array([k1 for k1, _ in subkeys], dtype=np.uint8)
+        self.k2_table = np.array([k2 for _, k2 in subkeys], dtype=np.uint8)
+
+    @staticmethod
+    def _as_uint(values, dtype, limit: int, name: str) -> np.ndarray:
+        """转换为指定无符号整数数组并检查取值范围"""
+        array = np.asarray(values)
+        if array.dtype != dtype:
+            if array.size and (array.min() < 0 or array.max() >= limit):
+                raise ValueError(f"{name}超出范围 0-{limit - 1}")
+            array = array.astype(dtype)
+        elif dtype == np.uint16 and array.size and array.max() >= limit:
+            raise ValueError(f"{name}超出范围 0-{limit - 1}")
+        return array
+
+    def _subkeys(self, keys):
+        """返回K1、K2（单个密钥为标量，密钥数组为逐元素数组）"""
+        if isinstance(keys, (str, int, PreparedKey)):
+            prepared = self.sdes.prepare_key(keys)
+            return prepared.k1, prepared.k2
+        keys = self._as_uint(keys, np.uint16, 1024, "密钥")
+        return self.k1_table[keys], self.k2_table[keys]
+
+    def _feistel(self, blocks: np.ndarray, first, second) -> np.ndarray:
+        """对数组执行IP、两轮Feistel与IP^-1"""
+        ip_result = self.ip_table[blocks]
+        left = ip_result >> 4
+        right = ip_result & 0x0F
+
+        # 第一轮
+        left ^= self.f_table[self.ep_table[right] ^ first]
+
+        # 交换后第二轮（第一轮结果作为右半部分）
+        right ^= self.f_table[self.ep_table[left] ^ second]
+
+        return self.ip_inv_table[(right << 4) | left]
+
+    def encrypt(self, blocks, keys) -> np.ndarray:
+        """批量加密：blocks为uint8数组，keys为单个密钥或与之形状匹配的uint16密钥数组"""
+        blocks = self._as_uint(blocks, np.uint8, 256, "数据块")
+        k1, k2 = self._subkeys(keys)
+        return self._feistel(blocks, k1, k2)
+
+    def decrypt(self, blocks, keys) -> np.ndarray:
+        """批量解密：blocks为uint8数组，keys为单个密钥或与之形状匹配的uint16密钥数组"""
+        blocks = self._as_uint(blocks, np.uint8, 256, "数据块")
+        k1, k2 = self._subkeys(keys)
+        return self._feistel(blocks, k2, k1)